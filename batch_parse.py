@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# coding UTF-8
+
+## Copyright 2013 Constantin Kulikov
+##
+## Author: Constantin Kulikov (Bad_ptr) <zxnotdead@gmail.com>
+## Date: 2013/08/09 16:40:12
+## License: GPL either version 2 or any later version
+
+"""
+Parsing of many sources with one Grammar in a pool of processes. The
+grammar is pickled once and loaded by each process, the results come back
+in the order of the sources or as they are done.
+
+    python batch_parse.py --grammar ebnf:cur_grammar --rule ebnf_grammar
+                          --reader mymodule:make_reader --jobs 4 FILE...
+"""
+
+from common_classes import thing_pprint
+
+from iters_readers  import (ReadResult, TextReader, NOMATCH, FULLMATCH, PARTIALMATCH)
+
+from readable_things import Num
+
+from parser         import (check_engine, read_into_with_stack)
+
+from utils          import _or
+
+from bisect         import bisect_left
+from concurrent.futures import (ProcessPoolExecutor, as_completed)
+from functools      import partial
+
+import argparse
+import importlib
+import os
+import pickle
+import sys
+
+
+# the grammar, rule, engine and reader maker of the process, see _init_parse_worker
+_parse_worker = None
+
+
+def _init_parse_worker(data, rule_name, engine, warm_up):
+    global _parse_worker
+    (grammar, reader) = pickle.loads(data)
+    rule = grammar.name_register[rule_name]
+    if "vm" == engine:
+        grammar.compile()
+    if None is not warm_up:
+        # the lazily built tables (Or dispatch, fused regexes, ...)
+        # are made before the first source
+        try:
+            grammar.parse(reader(warm_up), rule, engine=engine)
+        except Exception:
+            # the source fails again when it is parsed and reports it
+            pass
+    _parse_worker = (grammar, rule, engine, reader)
+
+
+def _parse_one(grammar, rule, engine, reader, source):
+    """Return (state, readed list, position, True if all read, exception raised or None)."""
+    try:
+        tr = reader(source)
+        rslt = grammar.parse(tr, rule, engine=engine)
+        return (rslt.state, rslt.readedlist, tr.tell(), None is tr.peek(), None)
+    except Exception as e:
+        return (NOMATCH, [], 0, False, e)
+
+
+def _parse_source(source):
+    # the rule is not sent back, it would bring the grammar with it
+    return _parse_one(*(_parse_worker + (source,)))
+
+
+def _parse_indexed(item):
+    return (item[0], _parse_source(item[1]))
+
+
+def parse_many(grammar, root_rule, sources, workers=None, ordered=True
+               , engine="recursive", reader=TextReader, warm_up="", chunksize=16):
+    """Parse each of `sources` with `root_rule` of `grammar` in `workers` processes.
+
+    `reader` makes the reader of a source, it must be picklable, e.g. a
+    module function or a functools.partial of one. It is pickled with the
+    grammar, so what they share (the token types of a TokenReader, ...)
+    is still shared when it is given in the partial, and not looked up by
+    the function in its module. Each process first
+    parses the source `warm_up` (None for none). Yield (index of the
+    source, ReadResult, reader position at the end, True if all of the
+    source was read) in the order of the sources, or as they are parsed
+    when `ordered` is False. A source whose reading or parsing raised an
+    exception gives a NOMATCH ReadResult with the exception as its
+    `readed_object`, the other sources are still parsed. With less than
+    2 workers the sources are parsed in this process. `engine` is one of
+    the engines of Grammar.parse, other names raise ValueError.
+    """
+    check_engine(engine, ("recursive", "stack", "vm"))
+    if isinstance(root_rule, str):
+        root_rule = grammar.name_register[root_rule]
+    workers = _or(workers, os.cpu_count() or 1)
+    if workers < 2:
+        for (i, source) in enumerate(sources):
+            done = _parse_one(grammar, root_rule, engine, reader, source)
+            yield (i, _read_result(root_rule, *done[:2], done[4])) + done[2:4]
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_parse_worker
+                             , initargs=(pickle.dumps((grammar, reader)), root_rule.name
+                                         , engine, warm_up)) as pool:
+        if ordered:
+            done = enumerate(pool.map(_parse_source, sources, chunksize=chunksize))
+        else:
+            futures = [pool.submit(_parse_indexed, item) for item in enumerate(sources)]
+            done = (future.result() for future in as_completed(futures))
+        for (i, (state, readedlist, position, read_all, error)) in done:
+            yield (i, _read_result(root_rule, state, readedlist, error), position, read_all)
+
+
+def _read_result(rule, state, readedlist, error):
+    if None is not error:
+        return ReadResult(NOMATCH, [], error)
+    return ReadResult(state, readedlist, rule)
+
+
+def _read_repetitions(num, tr, start, stop=-1, sync=None, engine="recursive"):
+    """Read the repetitions of the thing of the Num `num` from `start`.
+
+    They are read while they start before `stop` (-1 for no limit) and
+    not at a position in `sync`. Return (start positions, lists read,
+    position reached, True if no more repetitions follow).
+    """
+    tr.seek(start)
+    (starts, readed) = ([], [])
+    pos = start
+    while (stop < 0 or pos < stop) and not (sync and pos in sync):
+        acc = []
+        if "stack" == engine:
+            state = read_into_with_stack(num.thing, tr, acc)
+        else:
+            state = tr.read_thing_into(num.thing, acc)
+        if FULLMATCH != state:
+            return (starts, readed, pos, True)
+        starts.append(pos)
+        readed.append(acc)
+        pos = tr.tell()
+    return (starts, readed, pos, False)
+
+
+# the Num, text, reader maker and engine of the process, see _init_split_worker
+_split_worker = None
+
+
+def _init_split_worker(data, rule_name, text, engine):
+    global _split_worker
+    (grammar, reader) = pickle.loads(data)
+    _split_worker = (grammar.name_register[rule_name].thing, text, reader, engine)
+
+
+def _parse_part(start, stop):
+    (num, text, reader, engine) = _split_worker
+    return _read_repetitions(num, reader(text), start, stop, None, engine)
+
+
+def parse_parallel(grammar, root_rule, text, workers=None, engine="recursive"
+                   , reader=TextReader, chunk_size=None):
+    """Parse the string `text` with `root_rule` of `grammar`, reading parts of it in `workers` processes.
+
+    The thing of `root_rule` must be a Num with a `sync` string and no
+    maximum, the text is cut after the `sync` strings about `chunk_size`
+    chars apart and each part reads the repetitions up to the one that
+    crosses the next cut. The repetitions of a part are kept from the
+    position the previous ones reached, when one of them starts there;
+    otherwise (e.g. a `sync` string in a comment) they are read here up
+    to a position where one starts. The positions of the readers `reader`
+    makes must be offsets in the text (TextReader), see parse_many for
+    the rest. Return (ReadResult, reader position at the end), the same
+    as parsing the text here with `engine` ("recursive" or "stack", other
+    names raise ValueError).
+    """
+    check_engine(engine, ("recursive", "stack"))
+    if isinstance(root_rule, str):
+        root_rule = grammar.name_register[root_rule]
+    num = root_rule.thing
+    workers = _or(workers, os.cpu_count() or 1)
+    chunk_size = _or(chunk_size, max(1 << 16, len(text) // (4 * workers)))
+    bounds = [0]
+    if(isinstance(num, Num) and num.sync and num.max_num < 0
+       and not root_rule.is_left_recursive()):
+        while True:
+            cut = text.find(num.sync, bounds[-1] + chunk_size)
+            if cut < 0 or cut + len(num.sync) >= len(text):
+                break
+            bounds.append(cut + len(num.sync))
+    if workers < 2 or len(bounds) < 2:
+        tr = reader(text)
+        return (grammar.parse(tr, root_rule, engine=engine), tr.tell())
+    tr = reader(text)
+    readed = []
+    (pos, ended) = (0, False)
+    with ProcessPoolExecutor(workers, initializer=_init_split_worker
+                             , initargs=(pickle.dumps((grammar, reader)), root_rule.name
+                                         , text, engine)) as pool:
+        for (starts, part, part_pos, part_ended) in pool.map(_parse_part, bounds
+                                                             , bounds[1:] + [-1]):
+            if ended:
+                break
+            first = bisect_left(starts, pos)
+            if pos != part_pos and (first == len(starts) or starts[first] != pos):
+                # the part was cut inside a repetition
+                (_, more, pos, ended) = _read_repetitions(num, tr, pos, part_pos
+                                                          , set(starts), engine)
+                readed.extend(more)
+                if ended:
+                    break
+                first = bisect_left(starts, pos)
+            if first < len(starts) and starts[first] == pos:
+                readed.extend(part[first:])
+                (pos, ended) = (part_pos, part_ended)
+            elif pos == part_pos:
+                ended = part_ended
+    if not ended:
+        (_, more, pos, _) = _read_repetitions(num, tr, pos, -1, None, engine)
+        readed.extend(more)
+    if len(readed) < num.min_num:
+        tr = reader(text)
+        return (grammar.parse(tr, root_rule, engine=engine), tr.tell())
+    acc = [th for rep in readed for th in rep]
+    (flat, skip) = root_rule.wrap_options({})
+    if not flat:
+        acc = [root_rule.make_node(acc, skip)]
+    return (ReadResult(FULLMATCH, acc, root_rule), pos)
+
+
+def read_file(path, reader=TextReader, encoding="utf-8"):
+    """Return `reader` of the text of the file `path`."""
+    with open(path, encoding=encoding) as f:
+        return reader(f.read())
+
+
+def _import_object(spec):
+    """Return the object named by "module:attribute"."""
+    (module, _, name) = spec.partition(":")
+    obj = importlib.import_module(module)
+    for attr in name.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def main(argv=None):
+    argp = argparse.ArgumentParser(description="Parse files with a grammar in parallel.")
+    argp.add_argument("files", nargs="+", metavar="FILE")
+    argp.add_argument("-g", "--grammar", required=True, help="the Grammar, as module:attribute")
+    argp.add_argument("-r", "--rule", required=True, help="name of the rule to parse")
+    argp.add_argument("--reader", help="function making the reader of a text, as module:attribute"
+                      " (default: TextReader)")
+    argp.add_argument("-j", "--jobs", type=int, default=None, help="number of processes")
+    argp.add_argument("-e", "--engine", default="recursive", choices=("recursive", "stack", "vm"))
+    argp.add_argument("--unordered", action="store_true", help="print the results as they are done")
+    argp.add_argument("--tree", action="store_true", help="print the parse trees")
+    args = argp.parse_args(argv)
+    reader = TextReader
+    if args.reader:
+        reader = _import_object(args.reader)
+    states = {FULLMATCH: "fullmatch", PARTIALMATCH: "partialmatch"}
+    failed = 0
+    for (i, rslt, position, read_all) in parse_many(_import_object(args.grammar), args.rule, args.files
+                                          , args.jobs, not args.unordered, args.engine
+                                          , partial(read_file, reader=reader), args.files[0]):
+        state = states.get(rslt.state, "nomatch") + " at " + str(position)
+        if isinstance(rslt.readed_object, Exception):
+            state = "error " + type(rslt.readed_object).__name__ + ": " + str(rslt.readed_object)
+        elif FULLMATCH == rslt.state and not read_all:
+            state = "fullmatch of a prefix at " + str(position)
+        print(args.files[i] + ": " + state)
+        if args.tree:
+            thing_pprint(rslt.readedlist)
+        if FULLMATCH != rslt.state or not read_all:
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,8 @@
 from utils       import _or
 from collections import Iterable
 
+import re
+
 
 def gen_indentation(level=0):
     space = ""
@@ -19,11 +21,19 @@ def gen_indentation(level=0):
     return space
 
 class ClsShow():
+    # empty, so that subclasses declaring __slots__ really have no __dict__
+    __slots__ = ()
+
     def __repr__(self):
         hide = ["_ClsShow__no_repr"]
         if hasattr(self, "_ClsShow__no_repr"):
             hide = hide + self._ClsShow__no_repr
-        params = ", ".join("{!s}={!r}".format(k,v) for (k,v) in self.__dict__.items() if k not in hide)
+        if hasattr(self, "__dict__"):
+            items = self.__dict__.items()
+        else:
+            items = [(k, getattr(self, k)) for cls in type(self).__mro__
+                     for k in getattr(cls, "__slots__", ())]
+        params = ", ".join("{!s}={!r}".format(k,v) for (k,v) in items if k not in hide)
         return self.__class__.__name__ + "(" + params + ")"
 
     def __str__(self):
@@ -71,6 +81,8 @@ def thing_pprint(thing=None, level=0, pref="", post="", end="\n", first_indent=T
 
 
 class PStringable():
+    __slots__ = ()
+
     def as_string(self):
         return self._as_string()
 
@@ -105,6 +117,148 @@ class PLengthable():
                                   + " as PLengthable.")
 
 
+class PRegexable():
+    """Things that can tell a regular expression consuming what they consume.
+
+    `_as_regex` returns None when there is no such expression. Returned
+    expressions must not backtrack into themselves once matched (use
+    atomic groups), as the readers never do.
+    """
+    def as_regex(self):
+        return self._as_regex()
+
+    def _as_regex(self):
+        return None
+
+
+def _regex_has_atomic_groups():
+    try:
+        re.compile("(?>a)")
+    except re.error:
+        return False
+    return True
+
+REGEX_ATOMIC = _regex_has_atomic_groups()
+
+
+def thing_as_regex(thing):
+    if not REGEX_ATOMIC:
+        return None
+    if isinstance(thing, PRegexable):
+        return thing.as_regex()
+    elif isinstance(thing, str):
+        return re.escape(thing)
+    elif isinstance(thing, Iterable):
+        return regex_seq(thing)
+    else:
+        return None
+
+def regex_seq(things):
+    parts = [thing_as_regex(th) for th in things]
+    if None in parts:
+        return None
+    return "".join(parts)
+
+def regex_repeat(regex, min_num=0, max_num=-1):
+    if max_num < 0:
+        return "(?>(?:" + regex + "){" + str(min_num) + ",})"
+    return "(?>(?:" + regex + "){" + str(min_num) + "," + str(max_num) + "})"
+
+
+class AnyFirst(ClsShow):
+    __slots__ = ()
+
+# the first terminal of things starting with anything
+FIRST_ANY = AnyFirst()
+
+# key of the set of ids of the things reached again from themselves
+# without reading anything in a `first` memo
+FIRST_CYCLES = "cycles"
+
+
+class PFirstable():
+    """Things that know what they start with.
+
+    `_first` returns (terminals, nullable): a tuple of the terminals one
+    of which the next element must be accepted by (FIRST_ANY accepts
+    all), and whether the thing may match without reading anything.
+    `_accepts_first` tells if a terminal accepts the element `el`.
+    """
+    def first(self, memo=None):
+        if None is memo:
+            memo = {}
+        key = id(self)
+        if key in memo:
+            if None is memo[key]:
+                # recursion without reading, it may start with anything
+                memo.setdefault(FIRST_CYCLES, set()).add(key)
+                return ((FIRST_ANY,), True)
+            return memo[key]
+        memo[key] = None
+        memo[key] = ret = self._first(memo)
+        return ret
+
+    def _first(self, memo):
+        return ((FIRST_ANY,), True)
+
+    def accepts_first(self, el):
+        return self._accepts_first(el)
+
+    def _accepts_first(self, el):
+        return True
+
+
+def thing_first(thing, memo=None):
+    if isinstance(thing, PFirstable):
+        return thing.first(memo)
+    elif isinstance(thing, str):
+        if "" == thing:
+            return ((), True)
+        return ((thing,), False)
+    elif isinstance(thing, Iterable):
+        return first_seq(thing, memo)
+    else:
+        return ((FIRST_ANY,), True)
+
+def first_seq(things, memo=None):
+    terminals = []
+    for th in things:
+        (first, nullable) = thing_first(th, memo)
+        terminals.extend(first)
+        if not nullable:
+            return (tuple(terminals), False)
+    return (tuple(terminals), True)
+
+def thing_accepts_first(terminal, el):
+    if FIRST_ANY is terminal:
+        return True
+    elif None is el:
+        return False
+    elif isinstance(terminal, PFirstable):
+        return terminal.accepts_first(el)
+    elif isinstance(terminal, str):
+        if isinstance(el, str):
+            return terminal.startswith(el)
+        return el == terminal
+    else:
+        return True
+
+def first_accepts(first, el):
+    """Return True if one of the `first` terminals accepts `el`."""
+    for terminal in first:
+        if thing_accepts_first(terminal, el):
+            return True
+    return False
+
+def thing_first_key(el):
+    """Key of `el` such that elements with equal keys are accepted by the same terminals."""
+    if isinstance(el, str) or None is el:
+        return el
+    elif hasattr(el, "_first_key"):
+        return el._first_key()
+    return None
+
+
 def thing_as_length(thing):
     if isinstance(thing, PLengthable):
         return thing.as_length()
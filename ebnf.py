@@ -14,7 +14,7 @@ This is translated and slightly modified version of EBNF grammar
 
 from common_classes  import thing_pprint
 from utils           import SetRecursionLimit
-from iters_readers   import TextReader
+from iters_readers   import (TextReader, MmapIterator)
 from parser          import (Grammar, Node, TRef)
 from readable_things import (Literal, NotNeed, Seq, Num
                              , ZeroOrOne, ZeroOrMore, OneOrMore
@@ -75,7 +75,7 @@ rhs = Node("rhs", Or( concatenation
            , grammar=cur_grammar)
 
 rule = Node("rule", Seq(lhs, NotNeed("="), rhs, NotNeed(";")), grammar=cur_grammar)
-grammar = Node("ebnf_grammar", ZeroOrMore(rule), grammar=cur_grammar)
+grammar = Node("ebnf_grammar", ZeroOrMore(rule, commit=True, sync=";"), grammar=cur_grammar)
 
 
 if __name__ == '__main__':
@@ -86,9 +86,10 @@ if __name__ == '__main__':
                    , skip=True)
     skip_pattern = OneOrMore(Or(space, comment))
 
-    tr = TextReader(open("ebnf_test.txt"), skip_pattern=skip_pattern)
+    with MmapIterator("ebnf_test.txt") as text_iterator:
+        tr = TextReader(text_iterator, skip_pattern=skip_pattern)
 
-    #SetRecursionLimit(5000)
+        #SetRecursionLimit(5000)
 
-    rslt = grammar.read_from(tr)
+        rslt = grammar.read_from(tr)
     thing_pprint(rslt.readedlist)
@@ -17,7 +17,7 @@ from lexer_test      import (tt_identifier, tt_number, tt_operator, tt_terminato
                              , tok_comma, tok_period, tok_colon, tok_semicolon
                              , tok_accent
 
-                             , token_iterator, token_reader)
+                             , text_iterator, token_iterator, token_reader)
 
 from parser          import (Grammar, Node, TRef)
 
@@ -87,5 +87,6 @@ pn_grammar = Node("ebnf_grammar", ZeroOrMore(pn_rule), grammar=cur_grammar)
 if __name__ == '__main__':
     # SetRecursionLimit(5000)
     # lexing with tokens reduces recursion level
-    rslt = pn_grammar.read_from(token_reader)
+    with text_iterator:
+        rslt = pn_grammar.read_from(token_reader)
     thing_pprint(rslt.readedlist)
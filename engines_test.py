@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# coding UTF-8
+
+## Copyright 2013 Constantin Kulikov
+##
+## Author: Constantin Kulikov (Bad_ptr) <zxnotdead@gmail.com>
+## Date: 2013/08/10 12:05:41
+## License: GPL either version 2 or any later version
+
+"""
+Parse ebnf_test.txt with the ebnf grammar and some expressions with a
+left recursive grammar by every engine: the recursive readers, the
+stack engine, the vm, the generated parser and the readers of the fused
+grammar, with and without a packrat memo, and check that they give the
+same result.
+"""
+
+from iters_readers   import TextReader
+from parser          import (Grammar, Node, TRef, PackratMemo)
+from readable_things import (Seq, ZeroOrMore, OneOrMore, Rx, Concat, Or, Not)
+
+from ebnf            import (cur_grammar, grammar)
+
+import sys
+import types
+
+
+space = Node("space", Concat(OneOrMore(Or(" ", "\t", "\n"))), skip=True)
+comment = Node("comment", Seq("(", "*"
+                              , Node("text", Concat(ZeroOrMore(Not(Seq("*", ")")))))
+                              , "*", ")")
+               , skip=True)
+skip_pattern = OneOrMore(Or(space, comment))
+
+
+# left recursive rules: expr = expr "-" num | num, the same with its nodes
+# flattened, and sum and product nested in each other
+lr_grammar = Grammar()
+num = Node("num", Rx('[0-9]', max_chars=-1), grammar=lr_grammar)
+expr = Node("expr", Or(Seq(TRef("expr", grammar=lr_grammar), "-", num), num)
+            , grammar=lr_grammar)
+flat_expr = Node("flat_expr", Or(Seq(TRef("flat_expr", grammar=lr_grammar), "-", num), num)
+                 , flat_eq_name=True, grammar=lr_grammar)
+product = Node("product", Or(Seq(TRef("product", grammar=lr_grammar), "*", TRef("atom", grammar=lr_grammar))
+                             , TRef("atom", grammar=lr_grammar))
+               , grammar=lr_grammar)
+sum_ = Node("sum", Or(Seq(TRef("sum", grammar=lr_grammar), "+", product), product)
+            , grammar=lr_grammar)
+atom = Node("atom", Or(num, Seq("(", sum_, ")")), grammar=lr_grammar)
+
+lr_skip_pattern = OneOrMore(Or(" ", "\n"))
+lr_texts = [(expr, "1 - 2 - 3 - 4"), (expr, "7"), (expr, "1 - 2 -")
+            , (expr, " - ".join(str(i) for i in range(100)))
+            , (flat_expr, "10 - 20 - 30"), (flat_expr, "5")
+            , (sum_, "1 + 2 * 3 + 4 * (5 + 6 * 7) * 8"), (sum_, "((1 + 2) * 3 + 4)")]
+
+
+def parse_with(g, rule, skip, text, engine, memo=None):
+    tr = TextReader(text, skip_pattern=skip)
+    if None is not memo:
+        tr.set_memo(memo)
+    rslt = g.parse(tr, rule, engine=engine)
+    return (rslt.state, tr.tell(), repr(rslt.readedlist))
+
+
+def parse_generated(g, rule, skip, text, memo=False):
+    module = types.ModuleType("generated_parser")
+    source = g.generate_parser(skip_pattern=skip, memo=memo)
+    exec(compile(source, "generated_parser", "exec"), module.__dict__)
+    (rslt, end) = module.parse(text, rule.name)
+    return (rslt.state, end, repr(rslt.readedlist))
+
+
+def compare(name, expected, results):
+    """Print the results that differ from `expected`, return how many do."""
+    failed = 0
+    for (engine, result) in results:
+        if result != expected:
+            failed += 1
+            print(name + ", " + engine + ": differs, " + str(result[0]) + " at " + str(result[1]))
+    print(name + ": " + str(expected[0]) + " at " + str(expected[1]) + ", "
+          + str(len(results) - failed) + " of " + str(len(results)) + " the same")
+    return failed
+
+
+if __name__ == '__main__':
+    with open("ebnf_test.txt") as f:
+        text = f.read()
+    g = (cur_grammar, grammar, skip_pattern, text)
+
+    failed = 0
+    expected = parse_with(*g, "recursive")
+    results = [("recursive with memo", parse_with(*g, "recursive", PackratMemo()))
+               , ("stack", parse_with(*g, "stack"))
+               , ("stack with memo", parse_with(*g, "stack", PackratMemo()))
+               , ("vm", parse_with(*g, "vm"))
+               , ("vm with memo", parse_with(*g, "vm", PackratMemo()))]
+    for engine in ("recursive", "stack", "vm"):
+        # a small memo drops entries while parsing
+        small = PackratMemo(max_entries=64)
+        results.append((engine + " with small memo", parse_with(*g, engine, small)))
+        if 0 == small.evictions:
+            failed += 1
+            print("ebnf_test.txt, " + engine + ": nothing evicted")
+    results += [("generated", parse_generated(*g))
+               , ("generated with memo", parse_generated(*g, True))]
+    # the rules are changed in place, so the fused engines go last
+    cur_grammar.fuse_regular()
+    results += [("fused", parse_with(*g, "recursive"))
+                , ("fused stack", parse_with(*g, "stack"))
+                , ("fused vm", parse_with(*g, "vm"))
+                , ("fused generated", parse_generated(*g))]
+    failed += compare("ebnf_test.txt", expected, results)
+
+    for (rule, text) in lr_texts:
+        g = (lr_grammar, rule, lr_skip_pattern, text)
+        expected = parse_with(*g, "recursive")
+        results = []
+        for engine in ("recursive", "stack", "vm"):
+            results.append((engine + " with memo", parse_with(*g, engine, PackratMemo())))
+            if "recursive" != engine:
+                results.append((engine, parse_with(*g, engine)))
+        results += [("generated", parse_generated(*g))
+                    , ("generated with memo", parse_generated(*g, True))]
+        shown = text if len(text) < 40 else text[:30] + "..."
+        failed += compare(rule.name + " " + repr(shown), expected, results)
+
+    sys.exit(1 if failed else 0)
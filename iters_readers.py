@@ -12,14 +12,19 @@ from typecheck      import typecheck
 
 from common_classes import (ClsShow
                             , PStringable, thing_as_string
-                            , PLengthable, thing_as_length)
+                            , PLengthable, thing_as_length
+                            , PRegexable, thing_as_regex
+                            , PFirstable)
 
 from utils          import (_or, merge_nested_dicts, get_from_nested_dict, set_to_nested_dict
-                            , add_hook, run_pre_hooks)
+                            , add_hook, run_hooks, compile_hooks)
 
 from collections    import (deque, Iterable)
-from itertools      import islice
+from itertools      import (chain, islice)
 
+import codecs
+import mmap
+import os
 import re
 
 
@@ -29,11 +34,15 @@ PARTIALMATCH = 1
 
 
 class ReadResult(ClsShow):
+    __slots__ = ("state", "readedlist", "readed_object")
+
     def __init__(self, state=NOMATCH, readedlist=None, readed_object=None):
         self.state = state
-        self.readedlist = _or(readedlist, [])
-        if not isinstance(self.readedlist, list):
-            self.readedlist = [self.readedlist]
+        if None is readedlist:
+            readedlist = []
+        elif not isinstance(readedlist, list):
+            readedlist = [readedlist]
+        self.readedlist = readedlist
         self.readed_object = readed_object
 
     def __iter__(self):
@@ -52,7 +61,29 @@ class ReadResult(ClsShow):
         return self.state == NOMATCH
 
 
+class FrozenReadResult(ReadResult):
+    __slots__ = ()
+
+    def __init__(self, state=NOMATCH, readed_object=None):
+        object.__setattr__(self, "state", state)
+        object.__setattr__(self, "readedlist", ())
+        object.__setattr__(self, "readed_object", readed_object)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Shared " + self.__class__.__name__ + " can not be modified.")
+
+
+NOMATCH_RESULT = FrozenReadResult(NOMATCH)
+
+
 def Nomatch(readedlist=None, readed_object=None):
+    """Return a failed ReadResult.
+
+    When nothing was read the shared NOMATCH_RESULT is returned and
+    `readed_object` is dropped, so do not modify the result.
+    """
+    if not readedlist:
+        return NOMATCH_RESULT
     return ReadResult(NOMATCH, readedlist, readed_object)
 def Fullmatch(readedlist=None, readed_object=None):
     return ReadResult(FULLMATCH, readedlist, readed_object)
@@ -61,10 +92,19 @@ def Partialmatch(readedlist=None, readed_object=None):
 
 
 class BufferedIterator(ClsShow):
+    """Iterator with a pushback buffer and mark/reset checkpoints.
+
+    While a mark is held the elements read are kept in `history`, so that
+    `reset` can put them back in front of the buffer. Marks are absolute
+    element counts: `history_base` is the count of `history[0]`.
+    """
     def __init__(self, input_iterable=None, n_prelook=25):
         self.input_iterable = _or(input_iterable, ())
         self.n_prelook = n_prelook
         self.buffer = deque([])
+        self.history = []
+        self.history_base = 0
+        self.n_marks = 0
         self.at_end = False
         self.re_iter()
 
@@ -82,15 +122,32 @@ class BufferedIterator(ClsShow):
             except IndexError:
                 self.at_end = True
                 raise StopIteration
+        if self.n_marks:
+            self.history.append(ret)
+        else:
+            self.history_base += 1
         return ret
 
     def re_iter(self):
         self.input_iterator = iter(self.input_iterable)
         return self
 
+    def tell(self):
+        """Return the absolute position (count of elements read)."""
+        return self.history_base + len(self.history)
+
+    def seek(self, position):
+        """Go to `position`: back to a held mark or forward by reading."""
+        if position <= self.tell():
+            return self.reset(position)
+        while self.tell() < position:
+            next(self)
+        return self
+
     def refillbuffer(self):
-        for (el, n) in zip(self.input_iterator
-                           , range(self.n_prelook)):
+        # range goes first so zip stops before pulling an extra element
+        for (n, el) in zip(range(self.n_prelook)
+                           , self.input_iterator):
             self.push_forward(el)
         return self
 
@@ -103,57 +160,199 @@ class BufferedIterator(ClsShow):
     def push_back(self, el=None):
         if el is not None:
             self.at_end = False
+            if self.history and el == self.history[-1]:
+                self.history.pop()
+            elif not self.history and self.history_base > 0:
+                self.history_base -= 1
             self.buffer.appendleft(el)
         return self
 
+    def mark(self):
+        """Return a checkpoint of the current position for `reset`.
+
+        Every mark must be given back with `release` when it is not needed
+        anymore.
+        """
+        self.n_marks += 1
+        return self.history_base + len(self.history)
+
+    def reset(self, mark):
+        """Go back to the position where `mark` was taken."""
+        k = mark - self.history_base
+        if k < 0:
+            raise ValueError("Can not reset to a mark before the commit point.")
+        self.at_end = False
+        while len(self.history) > k:
+            self.buffer.appendleft(self.history.pop())
+        return self
+
+    def release(self, mark):
+        self.n_marks -= 1
+        if self.n_marks <= 0:
+            self.n_marks = 0
+            self.history_base += len(self.history)
+            self.history.clear()
+        return self
+
+    def commit(self):
+        """Declare that reading never goes back before the current position.
+
+        Whatever is kept only for backtracking over it is released, marks
+        taken before it can not be reset to anymore.
+        """
+        self.history_base += len(self.history)
+        self.history.clear()
+        return self
+
 
 class BufferedReader(ClsShow):
+    """Reader of the elements of a BufferedIterator.
+
+    `hooks` is a nested dict {"pre"/"post": {method name: [hook, ...]}},
+    the pre hooks of read_next and read_raw_next get (reader, None), the
+    post hooks get (reader, element read). The dict is compiled once, use
+    `add_hook` to add hooks later. Per-call hooks passed in the "hooks"
+    option are merged on every call, "nohooks" disables all of them.
+    """
     def __init__(self, inp_buf_iter=None, hooks=None):
         self.inp_buf_iter = _or(inp_buf_iter, BufferedIterator(tuple()))
         self.hooks = _or(hooks, {})
+        self.memo = None
+        # {position: {Node: seed}} of left recursive Nodes being grown, see parser.Node
+        self.growing = {}
+        self.compile_hooks()
+        self._ClsShow__no_repr = ["compiled_hooks", "growing"]
+
+    def set_memo(self, memo=None):
+        """Use the packrat `memo` (e.g. parser.PackratMemo) for the Nodes read, None turns it off."""
+        self.memo = memo
+        return self
+
+    def compile_hooks(self):
+        self.compiled_hooks = compile_hooks(self.hooks)
+        return self
+
+    def add_hook(self, hook_type="", hook_name="", hook=None):
+        add_hook(hook_type, hook_name, hook, self.hooks)
+        return self.compile_hooks()
+
+    def _run_call_hooks(self, hook_type, hook_name, el, options):
+        if not options.get("nohooks"):
+            hook_dict = merge_nested_dicts(self.hooks, options["hooks"])
+            run_hooks(hook_type, hook_name, hook_dict, (self, el))
 
     def push_back(self, thms=None):
         self.inp_buf_iter.push_back(thms)
         return self
 
+    def mark(self):
+        return self.inp_buf_iter.mark()
+
+    def reset(self, mark):
+        self.inp_buf_iter.reset(mark)
+        return self
+
+    def release(self, mark):
+        self.inp_buf_iter.release(mark)
+        return self
+
+    def commit(self):
+        self.inp_buf_iter.commit()
+        if None is not self.memo:
+            self.memo.commit(self.tell())
+        return self
+
+    def tell(self):
+        return self.inp_buf_iter.tell()
+
+    def seek(self, position):
+        self.inp_buf_iter.seek(position)
+        return self
+
     def slice(self, n=1):
         return islice(self.inp_buf_iter, n)
 
     def read_raw_next(self, **options):
-        if not bool(options.get("nohooks")):
-            run_pre_hooks("read_raw_next"
-                          , merge_nested_dicts(self.hooks, _or(options.get("hooks"), {}))
-                          , (self, None))
-        return next(self.inp_buf_iter)
+        if options.get("hooks"):
+            self._run_call_hooks("pre", "read_raw_next", None, options)
+            el = next(self.inp_buf_iter)
+            self._run_call_hooks("post", "read_raw_next", el, options)
+            return el
+        compiled = self.compiled_hooks
+        if not compiled or options.get("nohooks"):
+            return next(self.inp_buf_iter)
+        hook = compiled.get(("pre", "read_raw_next"))
+        if None is not hook:
+            hook(self, None)
+        el = next(self.inp_buf_iter)
+        hook = compiled.get(("post", "read_raw_next"))
+        if None is not hook:
+            hook(self, el)
+        return el
 
     def read_next(self, **options):
-        if not bool(options.get("nohooks")):
-            run_pre_hooks("read_next"
-                          , merge_nested_dicts(self.hooks, _or(options.get("hooks"), {}))
-                          , (self, None))
-        state = FULLMATCH
-        el = None
-        try:
-            el = self.read_raw_next(**options)
-        except StopIteration:
-            state = NOMATCH
-        return ReadResult(state, [el], el)
+        if options.get("hooks"):
+            self._run_call_hooks("pre", "read_next", None, options)
+            try:
+                el = self.read_raw_next(**options)
+            except StopIteration:
+                el = None
+            self._run_call_hooks("post", "read_next", el, options)
+        elif not self.compiled_hooks or options.get("nohooks"):
+            try:
+                el = self.read_raw_next(**options)
+            except StopIteration:
+                return NOMATCH_RESULT
+            return ReadResult(FULLMATCH, [el], el)
+        else:
+            compiled = self.compiled_hooks
+            hook = compiled.get(("pre", "read_next"))
+            if None is not hook:
+                hook(self, None)
+            try:
+                el = self.read_raw_next(**options)
+            except StopIteration:
+                el = None
+            hook = compiled.get(("post", "read_next"))
+            if None is not hook:
+                hook(self, el)
+        if None is el:
+            return NOMATCH_RESULT
+        return ReadResult(FULLMATCH, [el], el)
+
+    def hooked(self, **options):
+        """Return True if hooks run when reading with `options`."""
+        if options.get("hooks"):
+            return True
+        return bool(self.compiled_hooks) and not options.get("nohooks")
+
+    def peek(self, **options):
+        """Return the element read_next would read, None at the end of input."""
+        mark = self.mark()
+        rslt = self.read_next(**options)
+        self.reset(mark).release(mark)
+        if FULLMATCH == rslt.state:
+            return rslt.readedlist[0]
+        return None
 
     def read_el(self, el, **options):
+        mark = self.mark()
         cel = self.read_next(**options)
         if FULLMATCH == cel.state:
            if el != cel.readedlist[0]:
-               self.push_back(cel.readedlist)
-               return Nomatch(cel.readedlist, el)
+               self.reset(mark).release(mark)
+               return NOMATCH_RESULT
            else:
+               self.release(mark)
                return Fullmatch(cel.readedlist, el)
         else:
+            self.reset(mark).release(mark)
             return Nomatch([], el)
 
     def can_read_el(self, el):
+        mark = self.mark()
         reslt = self.read_el(el, dry_run=True)
-        if reslt.state == FULLMATCH:
-            self.push_back(reslt.readedlist)
+        self.reset(mark).release(mark)
         return reslt
 
     def read_thing(self, thing, **options):
@@ -165,16 +364,36 @@ class BufferedReader(ClsShow):
         else:
             return self.read_el(thing, **options)
 
+    def read_thing_into(self, thing, acc, **options):
+        """Read `thing` appending what is read to the `acc` list.
+
+        Return the state of the read, on failure `acc` is left as it was.
+        """
+        if isinstance(thing, BIReadable):
+            return thing.read_into(self, acc, **options)
+        reslt = self.read_thing(thing, **options)
+        if FULLMATCH == reslt.state:
+            acc.extend(reslt.readedlist)
+        return reslt.state
+
     def can_read_thing(self, thing):
+        mark = self.mark()
         reslt = self.read_thing(thing, dry_run=True)
-        if reslt.state == FULLMATCH:
-            self.push_back(reslt.readedlist)
+        self.reset(mark).release(mark)
         return reslt
 
+    def read_literals_into(self, literals, acc, **options):
+        """Read the first (or longest) string of the readable_things.LiteralSet `literals`.
+
+        Return the state, or None when the strings must be read one by one.
+        """
+        return None
+
     def read_thing_seq(self, thseq, **options):
         if((not isinstance(thseq, Iterable))
            or (isinstance(thseq, str) and len(thseq) < 2)):
             thseq = (thseq,)
+        mark = self.mark()
         acc = []
         state = FULLMATCH
         for th in thseq:
@@ -182,16 +401,16 @@ class BufferedReader(ClsShow):
             if FULLMATCH == reslt.state:
                 acc.extend(reslt.readedlist)
             else:
-                #self.push_back(reslt.readedlist)
-                self.push_back(acc)
+                self.reset(mark)
                 state = reslt.state
                 break
+        self.release(mark)
         return ReadResult(state, acc, thseq)
 
     def can_read_thing_seq(self, thseq):
+        mark = self.mark()
         reslt = self.read_thing_seq(thseq, dry_run=True)
-        if reslt.state == FULLMATCH:
-            self.push_back(reslt.readedlist)
+        self.reset(mark).release(mark)
         return reslt
 
 
@@ -223,21 +442,355 @@ class CharIterator(BufferedIterator):
         return thing_as_string(super().__next__())
 
 
+def window_chunks(text, start, size):
+    """Yield `text` from `start` in slices of `size` chars."""
+    for i in range(start, len(text), size):
+        yield text[i:i + size]
+
+
+class StringIterator(BufferedIterator):
+    """Character iterator over a text window addressed by an integer position.
+
+    A `str` input is used as the window directly, any other iterable must
+    yield string chunks (lines of a file for example) that are appended to
+    the window when reading runs past its end. Pushing back the text that
+    was just read only moves the position back, anything else is kept in
+    the `buffer` and read before the window.
+    `commit` drops the part of the window before the position, so reading
+    a stream with regular commits keeps the window bounded.
+    """
+    # a splice copies at most n_prelook chars after the position, the rest
+    # of the window is read again from the input, False to copy it all
+    splice_rest = True
+
+    def __init__(self, input_iterable=None, n_prelook=4096):
+        self.text = ""
+        self.pos = 0
+        self.offset = 0
+        self.committed = 0
+        self.input_done = False
+        super().__init__(input_iterable, n_prelook)
+
+    def __next__(self):
+        if self.buffer:
+            return self.buffer.popleft()
+        if self.pos >= len(self.text) and self.ensure(1) < 1:
+            self.at_end = True
+            raise StopIteration
+        ch = self.text[self.pos]
+        self.pos += 1
+        return ch
+
+    def re_iter(self):
+        self.buffer = deque([])
+        self.pos = 0
+        self.offset = 0
+        self.committed = 0
+        if isinstance(self.input_iterable, str):
+            self.text = self.input_iterable
+            self.input_iterator = iter(())
+            self.input_done = True
+        else:
+            self.text = ""
+            self.input_iterator = iter(self.input_iterable)
+            self.input_done = False
+        return self
+
+    def refillbuffer(self):
+        # grab at least as much as the window already holds,
+        # so that growing the window stays amortized linear
+        need = max(self.n_prelook, len(self.text))
+        chunks = []
+        for chunk in self.input_iterator:
+            chunk = thing_as_string(chunk)
+            chunks.append(chunk)
+            need -= len(chunk)
+            if need <= 0:
+                break
+        else:
+            self.input_done = True
+        return self.push_forward(''.join(chunks))
+
+    def tell(self):
+        """Return the absolute position in the input."""
+        return self.offset + self.pos
+
+    def mark(self):
+        if self.buffer:
+            # pushed back text that does not match the window
+            # is spliced in, so the mark is a plain position
+            self.splice()
+        return self.offset + self.pos
+
+    def splice(self):
+        """Put the `buffer` in the window at the position.
+
+        The committed part of the window is dropped in the same copy, and
+        with `splice_rest` only `n_prelook` chars after the position are
+        copied, the rest is read again in chunks when it is needed.
+        """
+        start = self.committed
+        end = len(self.text)
+        if self.splice_rest and end - self.pos > self.n_prelook:
+            end = self.pos + self.n_prelook
+            self.input_iterator = chain(window_chunks(self.text, end, self.n_prelook)
+                                        , self.input_iterator)
+            self.input_done = False
+        self.text = self.text[start:self.pos] + ''.join(self.buffer) + self.text[self.pos:end]
+        self.buffer.clear()
+        self.offset += start
+        self.pos -= start
+        self.committed = 0
+        return self
+
+    def reset(self, mark):
+        k = mark - self.offset
+        if k < 0:
+            raise ValueError("Can not reset to a mark before the commit point.")
+        self.at_end = False
+        self.buffer.clear()
+        self.pos = k
+        self.committed = min(self.committed, k)
+        return self
+
+    def release(self, mark):
+        return self
+
+    def seek(self, position):
+        return self.reset(position)
+
+    def commit(self):
+        # the window is copied only when the released part is at least
+        # as long as the rest of it, so commits stay amortized O(1)
+        if self.pos > 0 and self.pos >= len(self.text) - self.pos:
+            self.offset += self.pos
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        self.committed = self.pos
+        return self
+
+    def match_run(self, pattern, limit=-1):
+        """Return the length of the match of `pattern` at the position.
+
+        The match is at most `limit` chars long (-1 for no limit) and the
+        window is extended while the match reaches its end, so `pattern`
+        must be a repetition of single chars (its match only grows with
+        the text). The position is not moved.
+        """
+        count = 0
+        while True:
+            start = self.pos + count
+            end = len(self.text)
+            if limit >= 0:
+                end = min(end, self.pos + limit)
+            m = pattern.match(self.text, start, end)
+            if None is m:
+                return count
+            count += m.end() - start
+            if(self.pos + count < len(self.text)
+               or (limit >= 0 and count >= limit)
+               or self.ensure(count + 1) <= count):
+                return count
+
+    def ensure(self, n=1):
+        """Try to have `n` characters after the position, return how many there are."""
+        avail = len(self.text) - self.pos
+        while avail < n:
+            self.refillbuffer()
+            if len(self.text) - self.pos == avail:
+                break
+            avail = len(self.text) - self.pos
+        return avail
+
+    def push_forward(self, el=None):
+        if el is not None:
+            el = thing_as_string(el)
+            if len(el) > 0:
+                self.at_end = False
+                self.text += el
+        return self
+
+    def push_back(self, el=None):
+        if el is not None:
+            el = thing_as_string(el)
+            n = len(el)
+            if n > 0:
+                self.at_end = False
+                if(not self.buffer and n <= self.pos
+                   and self.text.startswith(el, self.pos - n)):
+                    self.pos -= n
+                    self.committed = min(self.committed, self.pos)
+                else:
+                    self.buffer.extendleft(reversed(el))
+        return self
+
+    def skip_string(self, string):
+        """Advance over `string` if the window at the position starts with it.
+
+        Return the number of leading characters of `string` that matched.
+        Must be called only when the `buffer` is empty.
+        """
+        self.ensure(len(string))
+        if self.text.startswith(string, self.pos):
+            self.pos += len(string)
+            return len(string)
+        n = 0
+        for ch in string:
+            if self.pos + n >= len(self.text) or ch != self.text[self.pos + n]:
+                break
+            n += 1
+        return n
+
+
+class MmapIterator(StringIterator):
+    """StringIterator over a memory-mapped file.
+
+    The file is decoded lazily, `chunk_size` bytes at a time, only when
+    reading runs past the end of the window. Close it with `close` or
+    use it in a `with` statement.
+    """
+    def __init__(self, file=None, encoding="utf-8", chunk_size=65536, n_prelook=4096):
+        if isinstance(file, str):
+            file = open(file, "rb")
+        self.file = file
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.mmap = None
+        if None is not self.file and os.fstat(self.file.fileno()).st_size > 0:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._ClsShow__no_repr = ["text", "mmap"]
+        super().__init__(None, n_prelook)
+
+    def re_iter(self):
+        super().re_iter()
+        self.input_iterator = self.decoded_chunks()
+        return self
+
+    def decoded_chunks(self):
+        if None is self.mmap:
+            return
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        for start in range(0, len(self.mmap), self.chunk_size):
+            chunk = decoder.decode(self.mmap[start:start + self.chunk_size])
+            if chunk:
+                yield chunk
+        chunk = decoder.decode(b"", final=True)
+        if chunk:
+            yield chunk
+
+    def close(self):
+        if None is not self.mmap:
+            self.mmap.close()
+            self.mmap = None
+        if None is not self.file:
+            self.file.close()
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class FeedIterator(StringIterator):
+    """StringIterator over the text given to `feed`.
+
+    Reading never waits for more text: when a read needs chars past the
+    text fed so far `starved` is set and the read sees the end of the
+    input, until `close` tells that no more text comes.
+    """
+    # the text fed is only in the window
+    splice_rest = False
+    def __init__(self, n_prelook=4096):
+        self.starved = False
+        super().__init__(None, n_prelook)
+
+    def re_iter(self):
+        super().re_iter()
+        self.input_done = False
+        return self
+
+    def refillbuffer(self):
+        if not self.input_done:
+            self.starved = True
+        return self
+
+    def feed(self, chunk):
+        return self.push_forward(chunk)
+
+    def close(self):
+        self.input_done = True
+        return self
+
+
 class TextReader(BufferedReader):
-    def __init__(self, chiter=None, hooks=None, skip_pattern=None):
-        hooks = _or(hooks, {})
+    """BufferedReader of characters.
+
+    What matches `skip_pattern` is skipped before every read element
+    (read with "nohooks", which also disables skipping). On a
+    StringIterator the skip pattern runs at most once per position, the
+    pattern is assumed to skip everything skippable in one go (e.g.
+    OneOrMore(...)). If it can be written as a regular expression, it is
+    matched with one regex call once the whole input is in the window or
+    there are at least `skip_lookahead` characters after the position.
+    Until the whole input is read the match goes on with more input when
+    it reaches the end of the window, and the pattern is read from where
+    the regex stopped.
+    """
+    def __init__(self, chiter=None, hooks=None, skip_pattern=None, skip_lookahead=65536):
         #self.skip_pattern = _or(skip_pattern, [])
         self.skip_pattern = skip_pattern
+        self.skip_lookahead = skip_lookahead
+        self.skip_regex = None
         if None is not self.skip_pattern:
-            add_hook("pre", "read_el"
-                     , lambda br, el: br.read_thing(self.skip_pattern, nohooks=True)
-                     , hooks)
-            add_hook("pre", "read_next"
-                     , lambda br, el: br.read_thing(self.skip_pattern, nohooks=True)
-                     , hooks)
+            skip_regex = thing_as_regex(self.skip_pattern)
+            if None is not skip_regex:
+                self.skip_regex = re.compile(skip_regex)
+        self.skipped_from, self.skipped_to = -1, -1
         super().__init__(chiter, hooks)
-        if not isinstance(self.inp_buf_iter, CharIterator):
+        if isinstance(self.inp_buf_iter, str):
+            self.inp_buf_iter = StringIterator(self.inp_buf_iter)
+        elif not isinstance(self.inp_buf_iter, (CharIterator, StringIterator)):
             self.inp_buf_iter = CharIterator(self.inp_buf_iter)
+        self._ClsShow__no_repr = ["compiled_hooks", "growing", "skip_regex"]
+
+    def skip(self):
+        it = self.inp_buf_iter
+        if not isinstance(it, StringIterator) or it.buffer:
+            self.read_thing(self.skip_pattern, nohooks=True)
+            return self
+        pos = it.tell()
+        if pos == self.skipped_to:
+            return self
+        if pos == self.skipped_from:
+            it.reset(self.skipped_to)
+            return self
+        if(None is not self.skip_regex
+           and (it.input_done or it.ensure(self.skip_lookahead) >= self.skip_lookahead)):
+            m = self.skip_regex.match(it.text, it.pos)
+            while None is not m and m.end() >= len(it.text) and not it.input_done:
+                # the skipped run may go on in the rest of the input
+                avail = len(it.text) - it.pos
+                if it.ensure(2 * avail + 1) <= avail:
+                    break
+                m = self.skip_regex.match(it.text, it.pos)
+            if None is not m:
+                it.pos = m.end()
+            if not it.input_done:
+                # the regex can not tell that a thing it stopped at (e.g. a
+                # comment) goes on in the input to come, the Nodes can
+                self.read_thing(self.skip_pattern, nohooks=True)
+        else:
+            self.read_thing(self.skip_pattern, nohooks=True)
+        self.skipped_from, self.skipped_to = pos, it.tell()
+        return self
+
+    def read_next(self, **options):
+        if None is not self.skip_pattern and not options.get("nohooks"):
+            self.skip()
+        return super().read_next(**options)
 
     def read_next_char(self, **options):
         return self.read_next(**options)
@@ -248,7 +801,61 @@ class TextReader(BufferedReader):
     def can_read_ch(self, ch):
         return self.can_read_el(ch)
 
+    def indexed_iterator(self, **options):
+        """Return the StringIterator if the text can be matched in place, else None."""
+        it = self.inp_buf_iter
+        if(not isinstance(it, StringIterator) or it.buffer
+           or self.compiled_hooks or options.get("hooks")):
+            return None
+        return it
+
+    def skips(self, **options):
+        """Return True if reading with `options` skips the skip pattern."""
+        return None is not self.skip_pattern and not options.get("nohooks")
+
+    def peek(self, **options):
+        it = self.indexed_iterator(**options)
+        if None is it:
+            return super().peek(**options)
+        mark = it.mark()
+        if self.skips(**options):
+            self.skip()
+        el = None
+        if it.ensure(1) >= 1:
+            el = it.text[it.pos]
+        it.reset(mark)
+        return el
+
+    def read_string_state(self, string, **options):
+        """Try to read `string` in one go from a StringIterator.
+
+        Return the state, or None when it must be read char by char.
+        """
+        it = self.indexed_iterator(**options)
+        if None is it:
+            return None
+        if not self.skips(**options):
+            if it.skip_string(string) == len(string):
+                return FULLMATCH
+            return NOMATCH
+        mark = it.mark()
+        self.skip()
+        n = it.skip_string(string)
+        if n == len(string):
+            return FULLMATCH
+        it.reset(mark)
+        if n > 0:
+            # the skip pattern may match between the chars
+            return None
+        return NOMATCH
+
     def read_string(self, string, **options):
+        state = self.read_string_state(string, **options)
+        if FULLMATCH == state:
+            return ReadResult(FULLMATCH, [string], string)
+        elif None is not state:
+            return NOMATCH_RESULT
+        mark = self.mark()
         acc = []
         state = FULLMATCH
         for ch in string:
@@ -257,28 +864,85 @@ class TextReader(BufferedReader):
                 acc.extend(rslt.readedlist)
             else:
                 state = rslt.state
-                self.push_back(acc)
+                self.reset(mark)
                 break
+        self.release(mark)
         return ReadResult(state, [''.join(acc)], string)
 
     def can_read_string(self, string):
+        mark = self.mark()
         rslt = self.read_string(string, dry_run=True)
-        if rslt.state == FULLMATCH:
-            self.push_back(rslt.readedlist)
+        self.reset(mark).release(mark)
         return rslt
 
+    def read_literals_into(self, literals, acc, **options):
+        it = self.indexed_iterator(**options)
+        if None is it:
+            return None
+        skips = self.skips(**options)
+        mark = it.mark()
+        if skips:
+            self.skip()
+        start = pos = it.pos
+        it.ensure(literals.max_len)
+        text = it.text
+        end = min(len(text), start + literals.max_len)
+        node = literals.trie
+        # {index of a string read: its end}, like read_string_state the
+        # strings are read in one go, then char by char if the skip
+        # pattern matches after the first chars
+        ends = {}
+        if None in node:
+            ends[node[None]] = start
+        chars = None
+        while pos < end:
+            node = node.get(text[pos])
+            if None is node:
+                break
+            pos += 1
+            if None in node:
+                ends.setdefault(node[None], pos)
+            if skips and None is chars and len(node) > (None in node):
+                it.pos = pos
+                self.skip()
+                if it.pos > pos:
+                    chars = (node, it.pos)
+        if None is not chars:
+            (node, it.pos) = chars
+            while it.ensure(1) >= 1:
+                node = node.get(it.text[it.pos])
+                if None is node:
+                    break
+                it.pos += 1
+                if None in node:
+                    ends.setdefault(node[None], it.pos)
+                if len(node) == (None in node):
+                    break
+                self.skip()
+        if not ends:
+            it.reset(mark)
+            return NOMATCH
+        if literals.longest:
+            found = min(ends, key=lambda i: (-len(literals.strings[i]), i))
+        else:
+            found = min(ends)
+        it.pos = ends[found]
+        acc.append(literals.strings[found])
+        return FULLMATCH
+
     def read_chars_by_regexp(self, regexp, **options):
         acc = ""
         state = NOMATCH
         while True:
-            rslt = read_next_char(**options)
-            if rslt.state == FULLMATCH:
-                if None is not re.match(regexp, rslt.readedlist[0]):
-                    state = FULLMATCH
-                    acc += rslt.readedlist[0]
-                else:
-                    self.push_back(rslt.readedlist)
+            mark = self.mark()
+            rslt = self.read_next_char(**options)
+            if(rslt.state == FULLMATCH
+               and None is not re.match(regexp, rslt.readedlist[0])):
+                self.release(mark)
+                state = FULLMATCH
+                acc += rslt.readedlist[0]
             else:
+                self.reset(mark).release(mark)
                 break
         return ReadResult(state, acc, regexp)
 
@@ -286,14 +950,15 @@ class TextReader(BufferedReader):
         acc = ""
         state = NOMATCH
         while True:
-            rslt = read_next_char(**options)
-            if rslt.state == FULLMATCH:
-                if None is not re.match(regexp, acc + rslt.readedlist[0]):
-                    state = FULLMATCH
-                    acc += rslt.readedlist[0]
-                else:
-                    self.push_back(rslt.readedlist)
+            mark = self.mark()
+            rslt = self.read_next_char(**options)
+            if(rslt.state == FULLMATCH
+               and None is not re.match(regexp, acc + rslt.readedlist[0])):
+                self.release(mark)
+                state = FULLMATCH
+                acc += rslt.readedlist[0]
             else:
+                self.reset(mark).release(mark)
                 break
         return ReadResult(state, [''.join(acc)], regexp)
 
@@ -307,10 +972,20 @@ class TextReader(BufferedReader):
         else:
             return self.read_el(thing, **options)
 
+    def read_thing_into(self, thing, acc, **options):
+        if isinstance(thing, str):
+            state = self.read_string_state(thing, **options)
+            if FULLMATCH == state:
+                acc.append(thing)
+                return state
+            elif None is not state:
+                return state
+        return super().read_thing_into(thing, acc, **options)
+
 
 
 
-class BIReadable(ClsShow):
+class BIReadable(ClsShow, PRegexable, PFirstable):
     #@typecheck(allow_unknown_keywords=True)
     def can_read_from(self:object, br:BufferedReader) -> ReadResult:
         return self._can_read_from(br)
@@ -319,14 +994,31 @@ class BIReadable(ClsShow):
     def read_from(self:object, br:BufferedReader, **options) -> ReadResult:
         return self._read_from(br, **options)
 
+    def read_into(self, br, acc, **options):
+        return self._read_into(br, acc, **options)
+
     def _read_from(self, br, **options):
         raise NotImplementedError("You must implement '_read_from' method"
                                   + "to use instances of " + repr(self.__class__.__name__)
                                   + " as BIReadable.")
 
+    def _as_literal(self):
+        """Return the string this always reads as a whole, None if there is none."""
+        return None
+
+    def _max_length(self, memo):
+        """Return the most chars the string of what this reads from a TextReader has, -1 if unbounded."""
+        return -1
+
+    def _read_into(self, br, acc, **options):
+        reslt = self._read_from(br, **options)
+        if FULLMATCH == reslt.state:
+            acc.extend(reslt.readedlist)
+        return reslt.state
+
     #@typecheck()
     def _can_read_from(self:object, br:BufferedReader) -> ReadResult:
+        mark = br.mark()
         reslt = self.read_from(br, dry_run=True)
-        if reslt.state == FULLMATCH:
-            br.push_back(reslt.readedlist)
+        br.reset(mark).release(mark)
         return reslt
@@ -11,16 +11,27 @@ from typecheck import typecheck
 
 from common_classes import (ClsShow, gen_indentation, thing_pprint
                             , PStringable, thing_as_string
-                            , PLengthable, thing_as_length)
+                            , PLengthable, thing_as_length
+                            , thing_first, first_accepts)
 
-from iters_readers  import (BufferedIterator
+from iters_readers  import (BufferedIterator, StringIterator
                             , BIReadable, BufferedReader, TextReader
-                            , ReadResult, Nomatch, Fullmatch, Partialmatch)
+                            , ReadResult, Nomatch, Fullmatch, Partialmatch
+                            , NOMATCH, FULLMATCH, NOMATCH_RESULT)
+
+from readable_things import (Literal, Rx, Fused, fuse, fuse_regular, thing_max_length
+                             , match_in_window)
 
 from utils          import (_or, get_from_nested_dict, merge_nested_dicts, set_to_nested_dict)
 
 from collections    import (deque, Iterable)
+from itertools      import islice
+
+from array          import array
+from bisect         import bisect_left
+from concurrent.futures import ProcessPoolExecutor
 
+import os
 import re
 
 
@@ -85,23 +96,43 @@ class Token(BIReadable, PStringable):
     def _as_string(self):
         return self.string
 
+    def _as_literal(self):
+        return self.string
+
+    def _max_length(self, memo):
+        return len(self.string)
+
+    def _first(self, memo):
+        return ((self,), "" == self.string)
+
+    def _accepts_first(self, el):
+        if isinstance(el, str):
+            return self.string.startswith(el)
+        elif isinstance(el, Token):
+            return self.string == el.string
+        return True
+
+    def _first_key(self):
+        return (self.string, self.type)
+
     def _read_from(self, tr, **options) -> ReadResult:
         if isinstance(tr, TextReader):
             rslt = tr.read_string(self.string, **options)
-            rslt.readed_list = [self]
-            rslt.readed_object = self
+            if rslt.is_fullmatch():
+                rslt.readed_object = self
             return rslt
         elif isinstance(tr, TokenReader):
+            mark = tr.mark()
             rslt = tr.read_next(**options)
             if rslt.is_fullmatch():
                 readed_tok = rslt.readedlist[0]
                 if self == readed_tok:
+                    tr.release(mark)
                     return rslt
-                else:
-                    tr.push_back(rslt.readedlist)
-            return Nomatch([], self)
+            tr.reset(mark).release(mark)
+            return NOMATCH_RESULT
         else:
-            return Nomatch([] ,self)
+            return NOMATCH_RESULT
 
 
 class TokenType(BIReadable):
@@ -109,32 +140,134 @@ class TokenType(BIReadable):
         self.name = _or(name, "")
         self.pattern = pattern
 
+    def _first(self, memo):
+        # on a TextReader it starts as its pattern, on a TokenReader with a token
+        return ((self,), thing_first(self.pattern, memo)[1])
+
+    def _accepts_first(self, el):
+        if isinstance(el, str):
+            (first, nullable) = thing_first(self.pattern)
+            return nullable or first_accepts(first, el)
+        elif isinstance(el, Token):
+            return el.type is self
+        return True
+
+    def _fuse_regular(self, memo):
+        # only the string of what the pattern reads is kept,
+        # so it is fused whatever it reads it as
+        fused = None
+        if not isinstance(self.pattern, (str, Literal, Rx)):
+            fused = fuse(self.pattern)
+        if None is fused:
+            fused = fuse_regular(self.pattern, memo)
+        self.pattern = fused
+
+    def _max_length(self, memo):
+        return thing_max_length(self.pattern, memo)
+
     def _read_from(self, tr, **options) -> ReadResult:
         if isinstance(tr, TextReader):
             rslt = tr.read_thing(self.pattern, **options)
             if rslt.is_fullmatch():
                 string = thing_as_string(rslt.readedlist)
-                rslt.readedlist = [Token(string, self)]
-            rslt.readed_object = self
+                return Fullmatch([Token(string, self)], self)
             return rslt
         elif isinstance(tr, TokenReader):
+            mark = tr.mark()
             rslt = tr.read_next(**options)
             if rslt.is_fullmatch():
                 readed_tok = rslt.readedlist[0]
                 if readed_tok == self:
+                    tr.release(mark)
                     rslt.readed_object = self
                     return rslt
-                else:
-                    tr.push_back(rslt.readedlist)
-            return Nomatch([], self)
+            tr.reset(mark).release(mark)
+            return NOMATCH_RESULT
         else:
-            return Nomatch([], self)
+            return NOMATCH_RESULT
 
 
 TTYPE_EOF  = TokenType("EOF", "")
 TOK_EOF = Token("", TTYPE_EOF)
 
 
+class TokenRegex(ClsShow):
+    """Regular expressions reading the first (or longest) of `token_types`.
+
+    `fused` are the readable_things.Fused reading the patterns of the
+    types. In mode "first" they are the named groups of one alternation
+    tried in order by a single match, in mode "longer" each one is
+    matched and the longest token is kept (the first one on ties). The
+    tokens are the ones the types read from a TextReader that does not
+    skip. Use `compile_token_regex` to make one.
+    """
+    def __init__(self, token_types=None, fused=None, mode="first"):
+        self.token_types = _or(token_types, [])
+        self.fused = _or(fused, [])
+        self.mode = mode
+        self.pattern = re.compile("|".join("(?P<t" + str(i) + ">" + f.regex + ")"
+                                           for (i, f) in enumerate(self.fused)))
+        memo = {}
+        self.max_lengths = [thing_max_length(tt, memo) for tt in self.token_types]
+        self._ClsShow__no_repr = ["fused", "pattern", "max_lengths"]
+
+    def token_string(self, i, m):
+        string = m.group()
+        if None is not self.fused[i].unescape:
+            string = self.fused[i].unescape.sub(r'\1', string)
+        return string
+
+    def match(self, it, lookahead):
+        """Return (type index, string, end) of the token at the position of the StringIterator `it`.
+
+        None if no type matches, the position is not moved.
+        """
+        if "first" == self.mode:
+            m = match_in_window(self.pattern, it, lookahead)
+            if None is m:
+                return None
+            # the groups of the types are the only ones
+            i = m.lastindex - 1
+            return (i, self.token_string(i, m), m.end())
+        best = None
+        for (k, fused) in enumerate(self.fused):
+            if None is not best and 0 <= self.max_lengths[k] <= len(best[1]):
+                continue
+            m = match_in_window(fused.pattern, it, lookahead)
+            if None is not m:
+                string = self.token_string(k, m)
+                if None is best or len(string) > len(best[1]):
+                    best = (k, string, m.end())
+        return best
+
+    def read_token(self, it, lookahead):
+        """Read a Token at the position of the StringIterator `it`, None if no type matches."""
+        match = self.match(it, lookahead)
+        if None is match:
+            return None
+        it.pos = match[2]
+        return Token(match[1], self.token_types[match[0]])
+
+
+def compile_token_regex(token_types, mode="first"):
+    """Return a TokenRegex reading `token_types` in `mode`, None if a pattern is not regular."""
+    if mode not in ("first", "longer") or not token_types:
+        return None
+    fused = []
+    for tt in token_types:
+        if not isinstance(tt, TokenType):
+            return None
+        f = tt.pattern if isinstance(tt.pattern, Fused) else fuse(tt.pattern)
+        if None is f or f.pattern.groups:
+            # numbered groups would be renumbered in the alternation
+            return None
+        fused.append(f)
+    try:
+        return TokenRegex(token_types, fused, mode)
+    except re.error:
+        return None
+
+
 class TokenIterator(BufferedIterator):
     def __init__(self, tr:TextReader=None, token_types=None, tokens_skip=None
                  , mode="first", n_prelook=25):
@@ -145,8 +278,14 @@ class TokenIterator(BufferedIterator):
         self.tokens_skip = _or(tokens_skip, [])
         self.mode = mode # "first" or "longer"
         self.n_prelook = n_prelook
+        self.max_lengths = None
+        self.token_regex = None
+        self.skip_types, self.skip_others = None, None
         self.buffer, self.backbuffer = deque([]), deque([])
+        # the read tokens are kept in backbuffer, it is the history for marks
+        self.history, self.history_base, self.n_marks = self.backbuffer, 0, 0
         self.at_end = False
+        self._ClsShow__no_repr = ["max_lengths", "token_regex", "skip_types", "skip_others"]
 
     def __iter__(self):
         return self
@@ -170,15 +309,53 @@ class TokenIterator(BufferedIterator):
             self.backbuffer.append(ret)
         if ret == TOK_EOF:
             self.at_end = True
-        if ret in self.tokens_skip:
+        if self.skipped(ret):
             ret = next(self)
         return ret
 
+    def skipped(self, tok):
+        """Return True if `tok` is in tokens_skip, by the id of its type for the TokenTypes there."""
+        if None is self.skip_types:
+            self.skip_types = frozenset(id(tt) for tt in self.tokens_skip
+                                        if isinstance(tt, TokenType))
+            self.skip_others = [t for t in self.tokens_skip if not isinstance(t, TokenType)]
+        if isinstance(tok, Token) and id(tok.type) in self.skip_types:
+            return True
+        return bool(self.skip_others) and tok in self.skip_others
+
     def re_iter(self):
         self.text_reader.inp_buf_iter.re_iter()
         return self
 
+    def commit(self):
+        super().commit()
+        self.text_reader.commit()
+        return self
+
+    def max_length(self, token_type):
+        """Return thing_max_length of `token_type`, computed once for all the token types."""
+        if None is self.max_lengths:
+            memo = {}
+            self.max_lengths = dict((id(tt), thing_max_length(tt, memo)) for tt in self.token_types)
+        return self.max_lengths[id(token_type)]
+
+    def regex(self):
+        """Return the TokenRegex of the token types (made once), None if they are not regular."""
+        if None is self.token_regex:
+            self.token_regex = _or(compile_token_regex(self.token_types, self.mode), False)
+        return self.token_regex or None
+
     def refillbuffer(self):
+        tr = self.text_reader
+        if not tr.skips() and None is not tr.indexed_iterator() and None is not self.regex():
+            # one regex match per token
+            it = tr.indexed_iterator()
+            for n in range(self.n_prelook):
+                tok = self.token_regex.read_token(it, tr.skip_lookahead)
+                if None is tok:
+                    break
+                self.push_forward(tok)
+            return self
         for n in range(self.n_prelook):
             if self.mode == "first":
                 for tt in self.token_types:
@@ -187,21 +364,30 @@ class TokenIterator(BufferedIterator):
                         self.push_forward(rslt.readedlist[0])
                         break
             elif self.mode == "longer":
+                # the longest token is kept with its end, the types
+                # that can not read a longer one are not tried
+                tr = self.text_reader
+                prune = not tr.hooked()
                 ml = -1
                 rt = None
+                mark = tr.mark()
                 for tt in self.token_types:
-                    rslt = self.text_reader.read_thing(tt)
+                    if prune and 0 <= self.max_length(tt) <= ml:
+                        continue
+                    rslt = tr.read_thing(tt)
                     if rslt.is_fullmatch():
                         tok = rslt.readedlist[0]
                         tl = len(tok.string)
                         if tl > ml:
                             ml = tl
                             rt = tok
-                        self.text_reader.push_back(rslt.readedlist)
+                            end = tr.tell()
+                        tr.reset(mark)
                 if None is not rt:
-                    rslt = self.text_reader.read_thing(rt)
-                    if rslt.is_fullmatch():
-                        self.push_forward(rslt.readedlist[0])
+                    tr.seek(end)
+                tr.release(mark)
+                if None is not rt:
+                    self.push_forward(rt)
             else:
                 break
         return self
@@ -234,9 +420,329 @@ class TokenIterator(BufferedIterator):
                     self.push_back(e)
             else:
                 self.at_end = False
-                be = self.backbuffer.pop()
-                if el != be:
-                    self.backbuffer.append(be)
+                if self.backbuffer and el == self.backbuffer[-1]:
+                    self.backbuffer.pop()
+                self.buffer.appendleft(el)
+        return self
+
+
+class TokenStream(ClsShow):
+    """Tokens of the string `text` kept as type ids and offsets.
+
+    The token `i` is of type `token_types[types[i]]` and spans
+    `text[starts[i]:ends[i]]`, its string is that slice (or the one kept
+    in `strings` when the type drops escape chars), equal strings are
+    shared. Token objects are made only by `token`, iterating gives the
+    tokens of the types not in `tokens_skip`. Use `lex` to make one.
+    """
+    def __init__(self, text=None, token_types=None, tokens_skip=None):
+        self.text = _or(text, "")
+        self.token_types = _or(token_types, [])
+        self.type_ids = {}
+        for (i, tt) in enumerate(self.token_types):
+            self.type_ids.setdefault(id(tt), i)
+        self.skip_ids = frozenset(self.type_ids[id(tt)] for tt in _or(tokens_skip, [])
+                                  if id(tt) in self.type_ids)
+        self.types = array('i')
+        self.starts, self.ends = array('q'), array('q')
+        self.strings = {}
+        self.interned = {}
+        self._ClsShow__no_repr = ["text", "type_ids", "types", "starts", "ends"
+                                  , "strings", "interned"]
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        return self.token(i)
+
+    def __iter__(self):
+        skip_ids = self.skip_ids
+        for (i, type_id) in enumerate(self.types):
+            if type_id not in skip_ids:
+                yield self.token(i)
+
+    def append(self, type_id, start, end, string=None):
+        """Add a token, `string` is only needed when it is not `text[start:end]`."""
+        if None is not string and string != self.text[start:end]:
+            self.strings[len(self.types)] = self.interned.setdefault(string, string)
+        self.types.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        return self
+
+    def extend(self, types, starts, ends, strings=None, first=0):
+        """Add the tokens from index `first` of the arrays of another TokenStream of the text."""
+        n = len(self.types) - first
+        for (i, string) in _or(strings, {}).items():
+            if i >= first:
+                self.strings[i + n] = self.interned.setdefault(string, string)
+        self.types.extend(types[first:])
+        self.starts.extend(starts[first:])
+        self.ends.extend(ends[first:])
+        return self
+
+    def type_id(self, token_type):
+        """Return the id of `token_type`, -1 if it is not one of the types."""
+        return self.type_ids.get(id(token_type), -1)
+
+    def string(self, i):
+        string = self.strings.get(i)
+        if None is string:
+            string = self.text[self.starts[i]:self.ends[i]]
+            string = self.interned.setdefault(string, string)
+        return string
+
+    def token(self, i):
+        return Token(self.string(i), self.token_types[self.types[i]])
+
+
+def lex(text, token_types, tokens_skip=None, mode="first"):
+    """Return the TokenStream of the string `text`.
+
+    The tokens are the ones a TokenIterator reads from `text` in `mode`,
+    lexing stops where no type matches, or after an empty token.
+    """
+    stream = TokenStream(text, token_types, tokens_skip)
+    lex_into(stream, compile_token_regex(stream.token_types, mode), mode)
+    return stream
+
+
+def lex_into(stream, token_regex, mode="first", start=0, stop=-1, sync=None):
+    """Add to `stream` the tokens of its text read from `start`.
+
+    Tokens are read while they start before `stop` (-1 for no limit) and
+    not at a position in `sync`, with `token_regex` or with a TokenIterator
+    when it is None. The tokens read from a position do not depend on what
+    was read before it. Return (position reached, True if lexing ended).
+    """
+    pos = start
+    if None is not token_regex:
+        it = StringIterator(stream.text)
+        it.pos = pos
+        while (stop < 0 or pos < stop) and not (sync and pos in sync):
+            match = token_regex.match(it, 0)
+            if None is match:
+                return (pos, True)
+            (type_id, string, end) = match
+            stream.append(type_id, pos, end, string)
+            if end == pos:
+                return (pos, True)
+            it.pos = pos = end
+        return (pos, False)
+    tr = TextReader(stream.text)
+    tr.seek(pos)
+    tokens = TokenIterator(tr, stream.token_types, None, mode, 1)
+    while (stop < 0 or pos < stop) and not (sync and pos in sync):
+        try:
+            tok = next(tokens)
+        except StopIteration:
+            return (pos, True)
+        # one token is read at a time, so the reader is at its end
+        end = tr.tell()
+        stream.append(stream.type_id(tok.type), pos, end, tok.string)
+        if end == pos:
+            return (pos, True)
+        pos = end
+    return (pos, False)
+
+
+# the chunk lexed by the processes of lex_parallel
+_lex_worker_stream, _lex_worker_regex, _lex_worker_mode = None, None, "first"
+
+
+def _init_lex_worker(text, token_types, mode):
+    global _lex_worker_stream, _lex_worker_regex, _lex_worker_mode
+    _lex_worker_stream = TokenStream(text, token_types)
+    _lex_worker_regex = compile_token_regex(token_types, mode)
+    _lex_worker_mode = mode
+
+
+def _lex_chunk(start, stop):
+    stream = _lex_worker_stream
+    stream.types, stream.starts, stream.ends = array('i'), array('q'), array('q')
+    stream.strings, stream.interned = {}, {}
+    (pos, ended) = lex_into(stream, _lex_worker_regex, _lex_worker_mode, start, stop)
+    return (stream.types, stream.starts, stream.ends, stream.strings, pos, ended)
+
+
+def lex_parallel(text, token_types, tokens_skip=None, mode="first"
+                 , workers=None, chunk_size=None):
+    """Return the TokenStream `lex` makes, lexing chunks of `text` in `workers` processes.
+
+    The chunks begin at line starts about `chunk_size` chars apart, each one
+    is lexed up to the token that crosses the next. The tokens of a chunk
+    are kept from the position the previous ones reached, when one of them
+    starts there; otherwise they are read here up to a position where one
+    starts. So the result does not depend on where the chunks begin, lines
+    only make it likely that no token crosses the cut.
+    """
+    stream = TokenStream(text, token_types, tokens_skip)
+    text = stream.text
+    workers = _or(workers, os.cpu_count() or 1)
+    chunk_size = _or(chunk_size, max(1 << 16, len(text) // (4 * workers)))
+    bounds = [0]
+    while True:
+        cut = text.find("\n", bounds[-1] + chunk_size)
+        if cut < 0 or cut + 1 >= len(text):
+            break
+        bounds.append(cut + 1)
+    token_regex = compile_token_regex(stream.token_types, mode)
+    if workers < 2 or len(bounds) < 2:
+        lex_into(stream, token_regex, mode)
+        return stream
+    (pos, ended) = (0, False)
+    with ProcessPoolExecutor(workers, initializer=_init_lex_worker
+                             , initargs=(text, stream.token_types, mode)) as pool:
+        chunks = pool.map(_lex_chunk, bounds, bounds[1:] + [-1])
+        for (types, starts, ends, strings, chunk_pos, chunk_ended) in chunks:
+            if ended:
+                break
+            first = bisect_left(starts, pos)
+            if pos != chunk_pos and (first == len(starts) or starts[first] != pos):
+                # no token of the chunk starts there
+                (pos, ended) = lex_into(stream, token_regex, mode, pos, chunk_pos, set(starts))
+                if ended:
+                    break
+                first = bisect_left(starts, pos)
+            if first < len(starts) and starts[first] == pos:
+                stream.extend(types, starts, ends, strings, first)
+                (pos, ended) = (chunk_pos, chunk_ended)
+            elif pos == chunk_pos:
+                ended = chunk_ended
+    if not ended:
+        # past the point where the last chunk stopped
+        lex_into(stream, token_regex, mode, pos)
+    return stream
+
+
+class TokenListIterator(BufferedIterator):
+    """Iterator over a list of tokens addressed by an index.
+
+    A TokenStream gives the tokens of the types it does not skip. The
+    tokens of a TokenStream or an iterator are added to the list
+    `n_prelook` at a time as the reading gets to them, any other iterable
+    of tokens is read into the list at once. Marks are indices, so
+    resetting and pushing back the tokens just read only move the index,
+    anything else pushed back is kept in the `buffer`. `commit` drops the
+    tokens before the position, `history_base` is the index of the first
+    one kept.
+    """
+    def __init__(self, tokens=None, token_types=None, n_prelook=256):
+        self.pos = 0
+        if isinstance(tokens, TokenStream):
+            token_types = _or(token_types, tokens.token_types)
+        self.token_types = _or(token_types, [])
+        super().__init__(_or(tokens, []), n_prelook)
+        self._ClsShow__no_repr = ["tokens"]
+
+    def __next__(self):
+        if self.buffer:
+            return self.buffer.popleft()
+        if self.ensure(1) < 1:
+            self.at_end = True
+            raise StopIteration
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def re_iter(self):
+        tokens = self.input_iterable
+        if isinstance(tokens, TokenStream) or iter(tokens) is tokens:
+            (self.tokens, self.input_iterator) = ([], iter(tokens))
+        else:
+            (self.tokens, self.input_iterator) = (list(tokens), iter(()))
+        self.buffer = deque([])
+        self.pos = 0
+        self.history_base = 0
+        return self
+
+    def refillbuffer(self):
+        self.tokens.extend(islice(self.input_iterator, self.n_prelook))
+        return self
+
+    def ensure(self, n=1):
+        """Try to have `n` tokens in the list after the position, return how many there are."""
+        avail = len(self.tokens) - self.pos
+        while avail < n:
+            self.refillbuffer()
+            if len(self.tokens) - self.pos == avail:
+                break
+            avail = len(self.tokens) - self.pos
+        return avail
+
+    def peek_token(self, k=0):
+        """Return the token `k` places after the position, None past the end."""
+        if self.buffer:
+            self.mark()
+        if self.ensure(k + 1) > k:
+            return self.tokens[self.pos + k]
+        return None
+
+    def tell(self):
+        return self.history_base + self.pos
+
+    def mark(self):
+        if self.buffer:
+            # pushed back tokens are spliced in, so the mark is a plain index
+            self.tokens[self.pos:self.pos] = self.buffer
+            self.buffer.clear()
+        return self.history_base + self.pos
+
+    def reset(self, mark):
+        k = mark - self.history_base
+        if k < 0:
+            raise ValueError("Can not reset to a mark before the commit point.")
+        self.at_end = False
+        self.buffer.clear()
+        self.pos = k
+        return self
+
+    def release(self, mark):
+        return self
+
+    def seek(self, position):
+        self.ensure(position - self.tell())
+        return self.reset(min(position, self.history_base + len(self.tokens)))
+
+    def commit(self):
+        # the list is copied only when the dropped part is at least
+        # as long as the rest of it, so commits stay amortized O(1)
+        if self.pos > 0 and self.pos >= len(self.tokens) - self.pos:
+            self.history_base += self.pos
+            del self.tokens[:self.pos]
+            self.pos = 0
+        return self
+
+    def push_forward(self, el=None):
+        if el is not None:
+            if isinstance(el, str):
+                tok = string_to_tok_by_type(el, self.token_types)
+                self.push_forward(_or(tok, Token(el)))
+            elif isinstance(el, Iterable):
+                for e in el:
+                    self.push_forward(e)
+            else:
+                self.at_end = False
+                self.tokens.append(el)
+        return self
+
+    def push_back(self, el=None):
+        if el is not None:
+            if(not self.buffer and self.pos > 0
+               and (el is self.tokens[self.pos - 1]
+                    or (isinstance(el, str) and self.tokens[self.pos - 1] == el))):
+                # the token just read, a string is not lexed again
+                self.at_end = False
+                self.pos -= 1
+            elif isinstance(el, str):
+                tok = string_to_tok_by_type(el, self.token_types)
+                self.push_back(_or(tok, Token(el)))
+            elif isinstance(el, Iterable):
+                for e in reversed(list(el)):
+                    self.push_back(e)
+            else:
+                self.at_end = False
                 self.buffer.appendleft(el)
         return self
 
@@ -244,26 +750,61 @@ class TokenIterator(BufferedIterator):
 class TokenReader(BufferedReader):
     def __init__(self, inp_buf_iter : TokenIterator=None, hooks=None):
         super().__init__(inp_buf_iter, hooks)
+        if isinstance(self.inp_buf_iter, TokenStream):
+            self.inp_buf_iter = TokenListIterator(self.inp_buf_iter)
         if(isinstance(self.inp_buf_iter, Iterable)
-           and not isinstance(self.inp_buf_iter, TokenIterator)):
+           and not isinstance(self.inp_buf_iter, (TokenIterator, TokenListIterator))):
             self.inp_buf_iter = TextReader(self.inp_buf_iter)
         if isinstance(self.inp_buf_iter, TextReader):
             self.inp_buf_iter = TokenIterator(self.inp_buf_iter)
 
     def read_thing(self, thing, **options):
         if isinstance(thing, (TokenType, Token, str)):
+            it = self.inp_buf_iter
+            if isinstance(it, TokenListIterator) and not self.hooked(**options):
+                # the token is compared in place
+                tok = it.peek_token()
+                if None is not tok and tok == thing:
+                    it.pos += 1
+                    return Fullmatch([tok], thing)
+                return NOMATCH_RESULT
+            mark = self.mark()
             rslt = self.read_next(**options)
             if rslt.is_fullmatch():
                 tok = rslt.readedlist[0]
                 if tok == thing:
+                    self.release(mark)
                     return Fullmatch([tok], thing)
-                else:
-                    self.push_back(rslt.readedlist)
-            return Nomatch([], thing)
+            self.reset(mark).release(mark)
+            return NOMATCH_RESULT
         elif isinstance(thing, BIReadable):
             return thing.read_from(self, **options)
         elif isinstance(thing, Iterable):
             return self.read_thing_seq(thing, **options)
         else:
-            return Nomatch([], thing)
+            return NOMATCH_RESULT
             #return self.read_thing(thing_as_string(thing), **options)
+
+    def read_literals_into(self, literals, acc, **options):
+        # the strings of the tokens are compared, so one lookup does
+        mark = self.mark()
+        rslt = self.read_next(**options)
+        if rslt.is_fullmatch():
+            tok = rslt.readedlist[0]
+            if not isinstance(tok, Token):
+                self.reset(mark).release(mark)
+                return None
+            if tok.string in literals.index:
+                self.release(mark)
+                acc.append(tok)
+                return FULLMATCH
+        self.reset(mark).release(mark)
+        return NOMATCH
+
+    def read_thing_into(self, thing, acc, **options):
+        if isinstance(thing, (TokenType, Token, str)):
+            rslt = self.read_thing(thing, **options)
+            if rslt.is_fullmatch():
+                acc.extend(rslt.readedlist)
+            return rslt.state
+        return super().read_thing_into(thing, acc, **options)
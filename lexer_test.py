@@ -13,7 +13,7 @@ from common_classes  import thing_pprint
 from lexer           import (Token, TokenType, TokenIterator, TokenReader
                              , string_to_tok_by_type)
 
-from iters_readers   import TextReader
+from iters_readers   import (TextReader, MmapIterator)
 
 from readable_things import (Literal, NotNeed, Seq, Num
                              , ZeroOrOne, ZeroOrMore, OneOrMore
@@ -67,14 +67,17 @@ tok_accent    = Token("`", tt_terminator)
 #tok_eof       = Token("",  tt_eof)
 
 
-token_iterator = TokenIterator(TextReader(open("ebnf_test.txt"))
+# read lazily, close it once done with the tokens
+text_iterator = MmapIterator("ebnf_test.txt")
+token_iterator = TokenIterator(TextReader(text_iterator)
                                , tt_list, tt_skip_list)
 token_reader = TokenReader(token_iterator)
 
 
 if __name__ == '__main__':
-    for tok in token_iterator:
-        thing_pprint(tok)
+    with text_iterator:
+        for tok in token_iterator:
+            thing_pprint(tok)
     # rslt = token_reader.read_next()
     # tok = rslt.readedlist[0]
     # while tok:
@@ -12,23 +12,38 @@ from typecheck      import typecheck
 
 from common_classes import (ClsShow, gen_indentation, thing_pprint
                             , PStringable, thing_as_string
-                            , PLengthable, thing_as_length)
+                            , PLengthable, thing_as_length
+                            , thing_as_regex, thing_first, FIRST_CYCLES)
 
-from iters_readers  import (BIReadable, TextReader
-                            , ReadResult , Nomatch, Fullmatch, Partialmatch)
+from iters_readers  import (BIReadable, TextReader, FeedIterator
+                            , ReadResult , Nomatch, Fullmatch, Partialmatch
+                            , NOMATCH, FULLMATCH)
 
-from utils          import (_or, get_from_nested_dict, merge_nested_dicts, set_to_nested_dict)
+from readable_things import (NotNeed, Seq, Num, Look, Or, fuse_regular, thing_max_length)
 
-from collections    import Iterable
+from utils          import (_or, get_from_nested_dict, merge_nested_dicts, set_to_nested_dict
+                            , freeze_nested_dict)
 
+from collections    import (Iterable, OrderedDict)
+
+import heapq
 import re
 
 
+def check_engine(engine, engines):
+    """Raise ValueError if `engine` is not one of the names `engines`."""
+    if engine not in engines:
+        raise ValueError("Can not parse with engine " + repr(engine) + ", use one of "
+                         + ", ".join(repr(name) for name in engines) + ".")
+
+
 class Grammar(ClsShow):
     def __init__(self, rules=None):
         self.name_register = {}
         self.rules = list(_or(rules,[]))
+        self.program = None
         #self._ClsShow__no_repr = ["name_register", "rules"]
+        self._ClsShow__no_repr = ["program"]
 
     def add_rule(self, rule):
         if hasattr(rule, 'name'):
@@ -37,6 +52,229 @@ class Grammar(ClsShow):
             self.rules.append(rule)
         return self
 
+    def parse(self, tr, rule, engine="recursive", **options):
+        """Read `rule` (a Node or the name of one) from the reader `tr`.
+
+        `engine` is "recursive" (the read_from calls), "stack" (see
+        read_with_stack) or "vm" (the compiled program, see compile), all
+        give the same ReadResult. Other names raise ValueError.
+        """
+        check_engine(engine, ("recursive", "stack", "vm"))
+        if isinstance(rule, str):
+            rule = self.name_register[rule]
+        if "stack" == engine:
+            return read_with_stack(rule, tr, **options)
+        if "vm" == engine:
+            if None is self.program:
+                self.compile()
+            return self.program.read_from(tr, rule, **options)
+        return tr.read_thing(rule, **options)
+
+    def iter_parse(self, tr, rule, engine="recursive", **options):
+        """Read `rule` from `tr` yielding what each repetition of it reads as soon as it is read.
+
+        The thing of `rule` must be a Num (e.g. the records of a file), the
+        reader is committed after each repetition so the input read before
+        is released. The repetitions are read until one fails (`tr.tell()`
+        is then where), what they read is not wrapped in the node of
+        `rule`. Other rules are parsed at once and what they read yielded.
+        `engine` is "recursive" or "stack" (the vm reads the whole input
+        first), other names raise ValueError.
+        """
+        check_engine(engine, ("recursive", "stack"))
+        if isinstance(rule, str):
+            rule = self.name_register[rule]
+        num = rule.thing
+        if not isinstance(num, Num):
+            rslt = self.parse(tr, rule, engine, **options)
+            if FULLMATCH == rslt.state:
+                yield from rslt.readedlist
+            return
+        n = 0
+        while num.max_num < 0 or n < num.max_num:
+            acc = []
+            if "stack" == engine:
+                state = read_into_with_stack(num.thing, tr, acc, **options)
+            else:
+                state = tr.read_thing_into(num.thing, acc, **options)
+            if FULLMATCH != state:
+                break
+            n += 1
+            tr.commit()
+            yield from acc
+
+    def compile(self):
+        """Return a new peg_vm.PegProgram for the rules, used by parse(engine="vm").
+
+        The code of the rules is compiled when they are first read, compile
+        again after changing the grammar.
+        """
+        from peg_vm import PegProgram
+        self.program = PegProgram(self)
+        return self.program
+
+    def fuse_regular(self):
+        """Fuse the lexical parts of the rules into regexes, see readable_things.fuse_regular."""
+        memo = {}
+        for rule in self.rules:
+            fuse_regular(rule, memo)
+        self.program = None
+        return self
+
+    def generate_parser(self, rules=None, skip_pattern=None, memo=False):
+        """Return the source of a Python module parsing `rules` (default: all), see parser_gen."""
+        from parser_gen import generate_parser
+        return generate_parser(self, rules, skip_pattern, memo)
+
+    def first_sets(self):
+        """Return {rule name: (FIRST terminals, nullable)} of the rules."""
+        memo = {}
+        return dict((rule.name, thing_first(rule, memo)) for rule in self.rules)
+
+
+
+class Parser(ClsShow):
+    """Push parser of `rule` of `grammar` over text given in chunks.
+
+    `feed` and `close` return what the repetitions of the Num of `rule`
+    completed by then read (as Grammar.iter_parse does), or the node of
+    `rule` when its thing is not a Num. A repetition is complete when
+    reading it did not need text past the chunks fed, else it is read
+    again from its start once the text after its start is twice as long
+    (or at `close`), so a long one fed in small chunks is read a
+    logarithmic number of times. As on any streamed input
+    the regexes (skipping, fused things) are matched `lookahead` chars
+    ahead (see TextReader), nothing they match may be longer than that.
+    `state` is FULLMATCH when what was read so far is a match of `rule`.
+    `engine` is "recursive" or "stack", other names raise ValueError.
+    """
+    def __init__(self, grammar=None, rule=None, skip_pattern=None, lookahead=4096
+                 , engine="recursive", hooks=None):
+        check_engine(engine, ("recursive", "stack"))
+        self.grammar = grammar
+        if isinstance(rule, str):
+            rule = grammar.name_register[rule]
+        self.rule = rule
+        self.engine = engine
+        self.feeder = FeedIterator()
+        self.reader = TextReader(self.feeder, hooks, skip_pattern, lookahead)
+        self.n = 0
+        self.done = False
+        # chars after the start of the starved repetition to wait for
+        self.wait_for = 0
+        self._ClsShow__no_repr = ["grammar", "reader"]
+
+    @property
+    def state(self):
+        num = self.rule.thing
+        if isinstance(num, Num):
+            return FULLMATCH if self.n >= num.min_num else NOMATCH
+        return FULLMATCH if self.n else NOMATCH
+
+    def feed(self, chunk):
+        """Add `chunk` to the text, return what the repetitions it completed read."""
+        self.feeder.feed(chunk)
+        return self.read()
+
+    def close(self):
+        """End the text, return what the last repetitions read."""
+        self.feeder.close()
+        return self.read()
+
+    def read(self):
+        """Read the repetitions complete in the text fed, return what they read."""
+        tr = self.reader
+        num = self.rule.thing
+        (thing, max_num) = (num.thing, num.max_num) if isinstance(num, Num) else (self.rule, 1)
+        readed = []
+        it = self.feeder
+        if not it.input_done and len(it.text) - it.pos < self.wait_for:
+            return readed
+        while not self.done and (max_num < 0 or self.n < max_num):
+            acc = []
+            avail = len(it.text) - it.pos
+            mark = tr.mark()
+            it.starved = False
+            if "stack" == self.engine:
+                state = read_into_with_stack(thing, tr, acc)
+            else:
+                state = tr.read_thing_into(thing, acc)
+            if it.starved:
+                # what was read may change with the text to come,
+                # nothing read at the end of the text fed is kept
+                tr.reset(mark).release(mark)
+                tr.skipped_from, tr.skipped_to = -1, -1
+                self.wait_for = 2 * avail
+                if None is not tr.memo:
+                    tr.memo.clear()
+                break
+            tr.release(mark)
+            if FULLMATCH != state:
+                self.done = True
+                break
+            self.n += 1
+            tr.commit()
+            readed.extend(acc)
+        return readed
+
+
+class PackratMemo(ClsShow):
+    """Packrat cache of Node results keyed by (rule, position, options).
+
+    Set it on a reader with `set_memo`. At most `max_entries` results are
+    kept, the least recently used are dropped first. On reader commits the
+    entries before the commit point are dropped, they can not be used
+    anymore. `hits`, `misses` and `evictions` count what happened.
+    """
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.by_position = {}
+        self.positions = []
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self._ClsShow__no_repr = ["entries", "by_position", "positions"]
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if None is entry:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        position = key[1]
+        keys = self.by_position.get(position)
+        if None is keys:
+            keys = self.by_position[position] = set()
+            heapq.heappush(self.positions, position)
+        keys.add(key)
+        self.entries[key] = entry
+        while len(self.entries) > self.max_entries:
+            (old_key, old) = self.entries.popitem(last=False)
+            self.by_position[old_key[1]].discard(old_key)
+            self.evictions += 1
+        return self
+
+    def commit(self, position):
+        while self.positions and self.positions[0] < position:
+            for key in self.by_position.pop(heapq.heappop(self.positions)):
+                del self.entries[key]
+                self.evictions += 1
+        return self
+
+    def clear(self):
+        self.entries.clear()
+        self.by_position.clear()
+        self.positions = []
+        return self
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
 
 
 # def pprint_node_list(nlist=None, level=0, pref=None):
@@ -121,7 +359,57 @@ class ParseNode(ClsShow, PStringable):
         return self
 
 
+class GrowingSeed(ClsShow):
+    """Result of a left recursive Node being grown at a position.
+
+    `readed` are the items read by the thing of the Node up to `end` (None
+    for the failed first seed), with a SeedUse for every read of the
+    previous seed `prev`, or with its items if `materialize`.
+    `stringified` is set when a use of the seed is turned into a string.
+    """
+    def __init__(self, end=None, readed=None, prev=None, materialize=False):
+        self.end = end
+        self.readed = readed
+        self.prev = prev
+        self.materialize = materialize
+        self.stringified = False
+
+
+class SeedUse(ClsShow, PStringable):
+    """Place of the previous seed in the items of a GrowingSeed."""
+    __slots__ = ("seed", "flat", "skip")
+
+    def __init__(self, seed=None, flat=False, skip=False):
+        self.seed = seed
+        self.flat = flat
+        self.skip = skip
+
+    def _as_string(self):
+        # the seed is grown again with its items in place
+        self.seed.stringified = True
+        return ""
+
+def seed_use_nested(readed):
+    """Return True if a SeedUse is inside one of `readed` instead of among them."""
+    stack = [th for th in readed if not isinstance(th, SeedUse)]
+    while stack:
+        th = stack.pop()
+        if isinstance(th, SeedUse):
+            return True
+        if isinstance(th, Iterable) and not isinstance(th, str):
+            stack.extend(th)
+    return False
+
+
 class Node(BIReadable):
+    """Read `thing` and wrap what it reads in a ParseNode named `name`.
+
+    Left recursive Nodes (reading themselves again before reading
+    anything, e.g. Node("sum", Or(Seq(TRef("sum"), "+", num), num))) are
+    grown from a seed: the thing is read again and again with the last
+    result as the value of the recursive read, while that gets longer.
+    With `flat_eq_name` the result is one flat node built in linear time.
+    """
     def __init__(self, name="", thing=None, skip=False, flat=False
                  , flat_eq_name=False, Type="", priority=1,
                  grammar=None, add_to_grammar=True):
@@ -133,9 +421,11 @@ class Node(BIReadable):
         self.priority = priority
         self.flat_eq_name = flat_eq_name
         self.add_to_grammar = add_to_grammar
+        self.left_recursive = None
+        self.left_reach = {}
         if(None is not grammar and self.add_to_grammar):
             grammar.add_rule(self)
-        self._ClsShow__no_repr = ["grammar"]
+        self._ClsShow__no_repr = ["grammar", "left_recursive", "left_reach"]
 
     def copy_with(self, name=None, thing=None, skip=None, flat=None
                   , flat_eq_name=None, Type=None, priority=None, grammar=None
@@ -148,18 +438,187 @@ class Node(BIReadable):
                     , grammar=_or(grammar, self.grammar), add_to_grammar=add_to_grammar)
 
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
-        rslt = tr.read_thing(self.thing, **options)
-        if rslt.is_fullmatch():
-            flat = _or(get_from_nested_dict(options, self.name + ".read_from", "flat")
-                       , self.flat)
-            skip = _or(get_from_nested_dict(options, self.name + ".read_from", "skip")
-                       , self.skip)
+        acc = []
+        state = self._read_into(tr, acc, **options)
+        return ReadResult(state, acc, self)
+
+    def _read_into(self, tr, acc, **options):
+        memo = tr.memo
+        if None is memo or options.get("hooks"):
+            return self._read_thing_into(tr, acc, **options)
+        key = (self, tr.tell(), freeze_nested_dict(options) if options else ())
+        entry = memo.get(key)
+        if None is not entry:
+            (state, end, readed) = entry
+            if FULLMATCH == state:
+                tr.seek(end)
+                acc.extend(readed)
+            return state
+        n = len(acc)
+        state = self._read_thing_into(tr, acc, **options)
+        if FULLMATCH == state:
+            memo.put(key, (state, tr.tell(), tuple(acc[n:])))
+        else:
+            memo.put(key, (state, None, ()))
+        return state
+
+    def _read_thing_into(self, tr, acc, **options):
+        n = len(acc)
+        seeds = None
+        if self.is_left_recursive():
+            seeds = tr.growing.get(tr.tell())
+            if None is not seeds and self in seeds:
+                return self._read_seed_into(seeds[self], tr, acc, options)
+        if self.left_recursive and (None is seeds or not any(self.reaches_left(node) for node in seeds)):
+            state = self._grow_into(tr, acc, **options)
+        else:
+            # other left recursive Nodes of the cycle of one grown here
+            # are read as usual, that one grows them all
+            state = tr.read_thing_into(self.thing, acc, **options)
+        if FULLMATCH == state:
+            (flat, skip) = self.wrap_options(options)
             # set_to_nested_dict(options, None, "BIReadable.read_from", "flat")
             # set_to_nested_dict(options, None, "BIReadable.read_from", "skip")
             if not flat:
-                rslt.readedlist = [ParseNode(self.name, rslt.readedlist, skip=skip, flat_eq_name=self.flat_eq_name
-                                             , parent=None, Type=self.type , priority=self.priority)]
-        return rslt
+                acc[n:] = [self.make_node(acc[n:], skip)]
+        return state
+
+    def wrap_options(self, options):
+        flat = _or(get_from_nested_dict(options, self.name + ".read_from", "flat")
+                   , self.flat)
+        skip = _or(get_from_nested_dict(options, self.name + ".read_from", "skip")
+                   , self.skip)
+        return (flat, skip)
+
+    def make_node(self, subnodes, skip):
+        return ParseNode(self.name, subnodes, skip=skip, flat_eq_name=self.flat_eq_name
+                         , parent=None, Type=self.type , priority=self.priority)
+
+    def is_left_recursive(self):
+        """True if the Node may read itself again before reading anything."""
+        if None is self.left_recursive:
+            memo = {}
+            self.first(memo)
+            self.left_recursive = id(self) in memo.get(FIRST_CYCLES, ())
+        return self.left_recursive
+
+    def reaches_left(self, node):
+        """True if the Node may read `node` before reading anything."""
+        reach = self.left_reach.get(node)
+        if None is reach:
+            memo = {id(node): None}
+            thing_first(self.thing, memo)
+            reach = self.left_reach[node] = id(node) in memo.get(FIRST_CYCLES, ())
+        return reach
+
+    def _read_seed_into(self, seed, tr, acc, options):
+        if None is seed.readed:
+            return NOMATCH
+        tr.seek(seed.end)
+        (flat, skip) = self.wrap_options(options)
+        if not seed.materialize:
+            acc.append(SeedUse(seed, flat, skip))
+        elif flat:
+            acc.extend(seed.readed)
+        else:
+            acc.append(self.make_node(seed.readed, skip))
+        return FULLMATCH
+
+    def _grow_into(self, tr, acc, **options):
+        position = tr.tell()
+        # results read while growing depend on the seed, do not memoize them
+        memo = tr.memo
+        tr.memo = None
+        mark = tr.mark()
+        try:
+            seed = self._grow(tr, position, mark, False, options)
+            if None is seed:
+                # the seed was read inside some other node,
+                # grow again putting its items in place right away
+                seed = self._grow(tr, position, mark, True, options)
+        finally:
+            tr.memo = memo
+            tr.release(mark)
+        if None is seed.readed:
+            return NOMATCH
+        tr.seek(seed.end)
+        if seed.materialize:
+            acc.extend(seed.readed)
+        else:
+            acc.extend(self._expand_seed(seed, self.wrap_options(options)[0]))
+        return FULLMATCH
+
+    def _grow(self, tr, position, mark, materialize, options):
+        seed = GrowingSeed(materialize=materialize)
+        # a Node grown where another one grows sees the seeds of both
+        outer = tr.growing.get(position)
+        seeds = dict(outer) if outer else {}
+        tr.growing[position] = seeds
+        seeds[self] = seed
+        try:
+            while True:
+                readed = []
+                state = tr.read_thing_into(self.thing, readed, **options)
+                end = tr.tell()
+                tr.reset(mark)
+                if not materialize and seed.stringified:
+                    # what was read depends on the string of the seed
+                    return None
+                if(FULLMATCH != state
+                   or (None is not seed.readed and end <= seed.end)):
+                    return seed
+                if not materialize and seed_use_nested(readed):
+                    return None
+                seed = GrowingSeed(end, readed, seed, materialize)
+                seeds[self] = seed
+        finally:
+            if None is outer:
+                del tr.growing[position]
+            else:
+                tr.growing[position] = outer
+
+    def _expand_seed(self, seed, flat):
+        """Return the items of `seed` with the seeds it used put in place."""
+        chain = []
+        while None is not seed and None is not seed.readed:
+            chain.append(seed)
+            seed = seed.prev
+        chain.reverse()
+        built = []
+        for (j, seed) in enumerate(chain):
+            # a use of the previous seed wrapped in a node with the same
+            # name is flattened anyway if this seed is read into such a node
+            splice_wrapped = self.flat_eq_name and not flat
+            if j + 1 < len(chain):
+                for th in chain[j + 1].readed:
+                    if isinstance(th, SeedUse):
+                        splice_wrapped = self.flat_eq_name and not th.flat
+                        break
+            readed = seed.readed
+            if(readed and isinstance(readed[0], SeedUse)
+               and (readed[0].flat or splice_wrapped)
+               and not any(isinstance(th, SeedUse) for th in readed[1:])):
+                built.extend(readed[1:])
+                continue
+            items = []
+            for th in readed:
+                if not isinstance(th, SeedUse):
+                    items.append(th)
+                elif th.flat or splice_wrapped:
+                    items.extend(built)
+                else:
+                    items.append(self.make_node(built, th.skip))
+            built = items
+        return built
+
+    def _as_regex(self):
+        return thing_as_regex(self.thing)
+
+    def _first(self, memo):
+        return thing_first(self.thing, memo)
+
+    def _max_length(self, memo):
+        return thing_max_length(self.thing, memo)
 
 
 class TRef(BIReadable):
@@ -177,3 +636,172 @@ class TRef(BIReadable):
 
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
         return tr.read_thing(self.unref(), **merge_nested_dicts(self.opts, options))
+
+    def _read_into(self, tr, acc, **options):
+        return tr.read_thing_into(self.unref(), acc, **merge_nested_dicts(self.opts, options))
+
+    def _first(self, memo):
+        return thing_first(self.unref(), memo)
+
+    def _max_length(self, memo):
+        return thing_max_length(self.unref(), memo)
+
+
+# The stack engine runs the routines below instead of the _read_into
+# methods of the same classes. A routine is a generator that yields
+# (thing, acc, options) to have `thing` read into `acc` and is sent
+# back the state, so the nesting of the input is kept in a list of
+# generators instead of the Python stack. Other things are read by
+# the reader as usual.
+
+def _stack_node(node, tr, acc, options):
+    if node.is_left_recursive():
+        return node.read_into(tr, acc, **options)
+    memo = tr.memo
+    key = None
+    if None is not memo and not options.get("hooks"):
+        key = (node, tr.tell(), freeze_nested_dict(options) if options else ())
+        entry = memo.get(key)
+        if None is not entry:
+            (state, end, readed) = entry
+            if FULLMATCH == state:
+                tr.seek(end)
+                acc.extend(readed)
+            return state
+    n = len(acc)
+    state = yield (node.thing, acc, options)
+    if FULLMATCH == state:
+        (flat, skip) = node.wrap_options(options)
+        if not flat:
+            acc[n:] = [node.make_node(acc[n:], skip)]
+    if None is not key:
+        if FULLMATCH == state:
+            memo.put(key, (state, tr.tell(), tuple(acc[n:])))
+        else:
+            memo.put(key, (state, None, ()))
+    return state
+
+def _stack_tref(tref, tr, acc, options):
+    return (yield (tref.unref(), acc, merge_nested_dicts(tref.opts, options)))
+
+def _stack_seq(thseq, tr, acc, options):
+    mark = tr.mark()
+    n = len(acc)
+    state = FULLMATCH
+    for th in thseq:
+        state = yield (th, acc, options)
+        if FULLMATCH != state:
+            tr.reset(mark)
+            del acc[n:]
+            break
+    tr.release(mark)
+    return state
+
+def _stack_seq_node(seq, tr, acc, options):
+    return (yield from _stack_seq(seq.thseq, tr, acc, options))
+
+def _stack_num(num, tr, acc, options):
+    mark = tr.mark()
+    start = len(acc)
+    state = FULLMATCH
+    n = 0
+    while True:
+        if num.max_num >= 0 and n >= num.max_num:
+            break
+        state = yield (num.thing, acc, options)
+        if FULLMATCH != state:
+            break
+        n += 1
+        if num.commit and n >= num.min_num:
+            tr.commit()
+    if FULLMATCH != state and n < num.min_num:
+        tr.reset(mark).release(mark)
+        del acc[start:]
+        return state
+    tr.release(mark)
+    return FULLMATCH
+
+def _stack_or(or_thing, tr, acc, options):
+    state = or_thing._read_literals_into(tr, acc, **options)
+    if None is not state:
+        return state
+    if or_thing.mode == "first":
+        for th in or_thing.alternatives(tr, **options):
+            state = yield (th, acc, options)
+            if FULLMATCH == state:
+                return state
+        return NOMATCH
+    elif or_thing.mode == "longer":
+        prune = isinstance(tr, TextReader) and not tr.hooked(**options)
+        maxl = -1
+        longest = None
+        mark = tr.mark()
+        for th in or_thing.alternatives(tr, **options):
+            if prune and 0 <= or_thing.alt_max_length(th) <= maxl:
+                continue
+            readed = []
+            state = yield (th, readed, options)
+            if FULLMATCH == state:
+                l = len(thing_as_string(readed))
+                if l > maxl:
+                    maxl = l
+                    longest = readed
+                    end = tr.tell()
+                tr.reset(mark)
+        if None is not longest:
+            tr.seek(end)
+        tr.release(mark)
+        if None is longest:
+            return NOMATCH
+        acc.extend(longest)
+        return FULLMATCH
+    return or_thing.read_into(tr, acc, **options)
+
+def _stack_notneed(notneed, tr, acc, options):
+    n = len(acc)
+    state = yield (notneed.thing, acc, options)
+    if FULLMATCH == state:
+        acc[n:] = [NotNeed(acc[n:])]
+    return state
+
+def _stack_look(look, tr, acc, options):
+    mark = tr.mark()
+    state = yield (look.thing, [], options)
+    tr.reset(mark).release(mark)
+    return state
+
+STACK_ROUTINES = {Node: _stack_node, TRef: _stack_tref, Seq: _stack_seq_node
+                  , Num: _stack_num, Or: _stack_or, NotNeed: _stack_notneed
+                  , Look: _stack_look, list: _stack_seq, tuple: _stack_seq}
+
+
+def read_into_with_stack(thing, tr, acc, **options):
+    """Read `thing` from `tr` into `acc` like tr.read_thing_into, with the
+    Node, TRef, Seq, Num, Or, NotNeed and Look parts on an explicit stack
+    (left recursive Nodes are read recursively)."""
+    stack = []
+    pending = (thing, acc, options)
+    state = None
+    while True:
+        if None is not pending:
+            (th, th_acc, th_options) = pending
+            pending = None
+            routine = STACK_ROUTINES.get(type(th))
+            if None is routine:
+                state = tr.read_thing_into(th, th_acc, **th_options)
+            else:
+                stack.append(routine(th, tr, th_acc, th_options))
+                state = None
+        if not stack:
+            return state
+        try:
+            pending = stack[-1].send(state)
+        except StopIteration as stop:
+            stack.pop()
+            state = stop.value
+
+def read_with_stack(thing, tr, **options):
+    acc = []
+    state = read_into_with_stack(thing, tr, acc, **options)
+    return ReadResult(state, acc, thing)
+
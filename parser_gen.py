@@ -0,0 +1,623 @@
+#!/usr/bin/env python
+# coding UTF-8
+
+## Copyright 2013 Constantin Kulikov
+##
+## Author: Constantin Kulikov (Bad_ptr) <zxnotdead@gmail.com>
+## Date: 2013/08/04 11:27:03
+## License: GPL either version 2 or any later version
+
+"""
+Generator of the Python source of a parser module for the rules of a
+Grammar: one function per Node (and set of options it is read with),
+literals inlined, regexes compiled at import, TRefs resolved. The
+functions read a str and give the same ParseNodes as Node._read_from
+with a TextReader over it.
+"""
+
+from common_classes  import (ClsShow, thing_as_regex, thing_first)
+
+from readable_things import (NotNeed, Literal, Seq, Num, Look, Rx, Concat, Or, Not, Fused)
+
+from parser          import (Node, TRef)
+
+from utils           import (merge_nested_dicts, freeze_nested_dict)
+
+import re
+
+
+# the helpers of every generated module, a read function takes
+# (text, pos, acc), appends what it reads to acc and returns the
+# position after it or -1
+RUNTIME = '''
+_growing = {}
+_memo = {}
+
+def _string(text, pos, string, acc):
+    start = _skip(text, pos)
+    if text.startswith(string, start):
+        acc.append(string)
+        return start + len(string)
+    if not text.startswith(string[0], start):
+        return -1
+    # the skip pattern may match between the chars
+    for ch in string:
+        pos = _skip(text, pos)
+        if not text.startswith(ch, pos):
+            return -1
+        pos += 1
+    acc.append(string)
+    return pos
+
+def _rx_run(text, pos, acc, pattern, min_chars, max_chars):
+    runs = []
+    n_chars = 0
+    while max_chars < 0 or n_chars < max_chars:
+        start = pos
+        pos = _skip(text, pos)
+        end = len(text)
+        if max_chars >= 0:
+            end = pos + max_chars - n_chars
+        n = pattern.match(text, pos, end).end() - pos
+        if n == 0:
+            pos = start
+            break
+        runs.append(text[pos:pos + n])
+        pos += n
+        n_chars += n
+    if n_chars < min_chars:
+        return -1
+    acc.append("".join(runs))
+    return pos
+
+def _rx_chars(text, pos, acc, pattern, min_chars, max_chars, skips, whole):
+    read = ""
+    n_chars = 0
+    while max_chars < 0 or n_chars < max_chars:
+        start = pos
+        if skips:
+            pos = _skip(text, pos)
+        if pos >= len(text) or None is pattern.match(read + text[pos] if whole else text[pos]):
+            pos = start
+            break
+        read += text[pos]
+        pos += 1
+        n_chars += 1
+    if n_chars < min_chars:
+        return -1
+    acc.append(read)
+    return pos
+
+def _literals(text, pos, acc, trie, strings, longest, skips):
+    # the first (or longest) of the strings of an Or in one pass, read in
+    # one go or char by char if the skip pattern matches after a prefix
+    start = pos = _skip(text, pos) if skips else pos
+    node = trie
+    ends = {}
+    if None in node:
+        ends[node[None]] = start
+    chars = None
+    while pos < len(text):
+        node = node.get(text[pos])
+        if None is node:
+            break
+        pos += 1
+        if None in node:
+            ends.setdefault(node[None], pos)
+        if skips and None is chars and len(node) > (None in node) and _skip(text, pos) > pos:
+            chars = (node, _skip(text, pos))
+    if None is not chars:
+        (node, pos) = chars
+        while pos < len(text):
+            node = node.get(text[pos])
+            if None is node:
+                break
+            pos += 1
+            if None in node:
+                ends.setdefault(node[None], pos)
+            if len(node) == (None in node):
+                break
+            pos = _skip(text, pos)
+    if not ends:
+        return -1
+    if longest:
+        found = min(ends, key=lambda i: (-len(strings[i]), i))
+    else:
+        found = min(ends)
+    acc.append(strings[found])
+    return ends[found]
+
+def _grow(read, key, text, pos, acc):
+    # the results of a left recursive rule read with the last one as
+    # the result of reading it again at pos, while they get longer
+    seed = None
+    # a rule grown where another one grows sees the seeds of both
+    outer = _growing.get(pos)
+    seeds = dict(outer) if outer else {}
+    _growing[pos] = seeds
+    seeds[key] = None
+    try:
+        while True:
+            readed = []
+            end = read(text, pos, readed)
+            if end < 0 or (None is not seed and end <= seed[0]):
+                break
+            seed = seeds[key] = (end, readed)
+    finally:
+        if None is outer:
+            del _growing[pos]
+        else:
+            _growing[pos] = outer
+    if None is seed:
+        return -1
+    acc.extend(seed[1])
+    return seed[0]
+'''
+
+NO_SKIP = '''
+_skipped = [None, -1, -1]
+
+def _skip(text, pos):
+    return pos
+'''
+
+# at most once per position, as TextReader.skip
+SKIP = '''
+_skipped = [None, -1, -1]
+
+def _skip(text, pos):
+    if text is _skipped[0]:
+        if pos == _skipped[2]:
+            return pos
+        if pos == _skipped[1]:
+            return _skipped[2]
+{0}
+    _skipped[:] = [text, pos, end]
+    return end
+'''
+
+SKIP_REGEX = '''
+    m = _skip_regex.match(text, pos)
+    end = pos if None is m else m.end()'''
+
+SKIP_THING = '''
+    end = {0}(text, pos, [])
+    if end < 0:
+        end = pos'''
+
+# packrat memo of a rule function, not used where a left recursive rule
+# is grown (the results there depend on its seed)
+MEMO = '''
+def {0}(text, pos, acc):
+    if pos in _growing:
+        return {1}(text, pos, acc)
+    entry = _memo.get(({2}, pos))
+    if None is entry:
+        n = len(acc)
+        end = {1}(text, pos, acc)
+        _memo[({2}, pos)] = (end, tuple(acc[n:]) if end >= 0 else ())
+        return end
+    acc.extend(entry[1])
+    return entry[0]
+'''
+
+PARSE = '''
+def parse(text, rule={0!r}, pos=0):
+    """Read `rule` from `text` at `pos`, return (ReadResult, end position)."""
+    _growing.clear()
+    _memo.clear()
+    _skipped[:] = [None, -1, -1]
+    acc = []
+    end = RULES[rule](text, pos, acc)
+    if end < 0:
+        return (ReadResult(NOMATCH, [], rule), pos)
+    return (ReadResult(FULLMATCH, acc, rule), end)
+'''
+
+
+class ParserGenerator(ClsShow):
+    """Generator of the source of a parser module for `grammar`.
+
+    The module skips what `skip_pattern` matches like a TextReader made
+    with it. Rx, Num, Or, Seq, Concat, NotNeed, Look, Not, Literal, TRef,
+    Node and strings can be generated, left recursive Nodes included.
+    Num commits are not done, the whole text is in memory. With `memo`
+    the results of the Node functions are kept per position (as with a
+    PackratMemo on the reader), else nested input may take exponential
+    time. The functions call each other as the Nodes nest, deeply nested
+    input needs a higher sys.setrecursionlimit.
+    """
+    def __init__(self, grammar=None, skip_pattern=None, memo=False):
+        self.grammar = grammar
+        self.skip_pattern = skip_pattern
+        self.skipping = None is not skip_pattern
+        self.memo = memo
+        self.n_memoized = 0
+        self.functions = {}
+        self.names = set()
+        self.constants = {}
+        self.sources = []
+        self.counter = 0
+        self.left_recursive = {}
+        self.reaches = []
+        self._ClsShow__no_repr = ["grammar", "functions", "names", "constants", "sources"
+                                  , "counter", "left_recursive", "reaches"]
+
+    def new_name(self, name):
+        name = re.sub(r'\W', '_', name)
+        if name in self.names:
+            name += "_" + str(len(self.names))
+        self.names.add(name)
+        return name
+
+    def temp(self, prefix):
+        self.counter += 1
+        return prefix + str(self.counter)
+
+    def constant(self, prefix, source):
+        """Return the name of a module constant with the value of `source`."""
+        name = self.constants.get(source)
+        if None is name:
+            name = self.constants[source] = self.new_name(prefix + str(len(self.constants)))
+        return name
+
+    def regex(self, regexp):
+        return self.constant("_rx", "re.compile(" + repr(regexp) + ")")
+
+    def skips(self, options):
+        return self.skipping and not options.get("nohooks")
+
+    def function(self, thing, options):
+        """Return the name of the read function of `thing` with `options`."""
+        if isinstance(thing, TRef):
+            return self.function(self.unref(thing), merge_nested_dicts(thing.opts, options))
+        if isinstance(thing, Literal):
+            thing = thing.string
+        key = (thing if isinstance(thing, (Node, str)) else id(thing)
+               , freeze_nested_dict(options))
+        name = self.functions.get(key)
+        if None is name:
+            if isinstance(thing, Node):
+                name = self.new_name("rule_" + thing.name)
+            else:
+                name = self.new_name("_read" + str(len(self.functions)))
+            self.functions[key] = name
+            lines = ["def " + name + "(text, pos, acc):"]
+            if isinstance(thing, Node) and self.memo:
+                body = self.new_name("_" + name)
+                self.sources.append(MEMO.format(name, body, self.n_memoized).strip())
+                self.n_memoized += 1
+                lines = ["def " + body + "(text, pos, acc):"]
+                self.emit_node(thing, options, lines)
+            elif isinstance(thing, Node):
+                self.emit_node(thing, options, lines)
+            else:
+                self.emit(thing, options, lines, "    ")
+                lines.append("    return pos")
+            self.sources.append("\n".join(lines))
+        return name
+
+    def unref(self, tref):
+        node = tref.unref()
+        if None is node:
+            raise ValueError("Can not generate a parser, no rule named " + repr(tref.ref_name) + ".")
+        return node
+
+    def call(self, thing, options, lines, ind):
+        lines.append(ind + "pos = " + self.function(thing, options) + "(text, pos, acc)")
+        lines.append(ind + "if pos < 0:")
+        lines.append(ind + "    return -1")
+
+    def wrap(self, node, options, subnodes):
+        (flat, skip) = node.wrap_options(options)
+        if flat:
+            return None
+        return ("ParseNode(" + repr(node.name) + ", " + subnodes + ", skip=" + repr(skip)
+                + ", flat_eq_name=" + repr(node.flat_eq_name) + ", parent=None, Type="
+                + repr(node.type) + ", priority=" + repr(node.priority) + ")")
+
+    def emit_node(self, node, options, lines):
+        node_expr = self.wrap(node, options, "acc[n:]")
+        if node.is_left_recursive():
+            key = self.left_recursive.setdefault(node, len(self.left_recursive))
+            read = self.function(node.thing, options)
+            seed_expr = self.wrap(node, options, "seed[1]")
+            lines.append("    seeds = _growing.get(pos)")
+            lines.append("    if None is not seeds and " + str(key) + " in seeds:")
+            lines.append("        seed = seeds[" + str(key) + "]")
+            lines.append("        if None is seed:")
+            lines.append("            return -1")
+            if None is seed_expr:
+                lines.append("        acc.extend(seed[1])")
+            else:
+                lines.append("        acc.append(" + seed_expr + ")")
+            lines.append("        return seed[0]")
+            # the keys of the left recursive rules it reads leftmost
+            # are known once all of the functions are generated
+            reaches = self.new_name("_reaches" + str(key))
+            self.reaches.append((node, reaches))
+            lines.append("    n = len(acc)")
+            lines.append("    if None is seeds or seeds.keys().isdisjoint(" + reaches + "):")
+            lines.append("        pos = _grow(" + read + ", " + str(key) + ", text, pos, acc)")
+            lines.append("    else:")
+            lines.append("        pos = " + read + "(text, pos, acc)")
+            lines.append("    if pos < 0:")
+            lines.append("        return -1")
+        else:
+            lines.append("    n = len(acc)")
+            self.emit(node.thing, options, lines, "    ")
+        if None is not node_expr:
+            lines.append("    acc[n:] = [" + node_expr + "]")
+        lines.append("    return pos")
+
+    def emit(self, thing, options, lines, ind):
+        """Append to `lines` the code reading `thing`, returning -1 if it does not match."""
+        kind = type(thing)
+        skips = self.skips(options)
+        if isinstance(thing, str):
+            if skips and len(thing) > 1:
+                lines.append(ind + "pos = _string(text, pos, " + repr(thing) + ", acc)")
+                lines.append(ind + "if pos < 0:")
+                lines.append(ind + "    return -1")
+                return
+            if skips:
+                lines.append(ind + "pos = _skip(text, pos)")
+            if thing:
+                lines.append(ind + "if not text.startswith(" + repr(thing) + ", pos):")
+                lines.append(ind + "    return -1")
+                lines.append(ind + "pos += " + str(len(thing)))
+            lines.append(ind + "acc.append(" + repr(thing) + ")")
+        elif kind in (Node, TRef):
+            self.call(thing, options, lines, ind)
+        elif kind is Literal:
+            self.emit(thing.string, options, lines, ind)
+        elif kind in (Seq, Concat, list, tuple):
+            thseq = thing if kind in (list, tuple) else thing.thseq
+            n = self.temp("n")
+            if kind is Concat:
+                lines.append(ind + n + " = len(acc)")
+            for th in thseq:
+                self.emit(th, options, lines, ind)
+            if kind is Concat:
+                lines.append(ind + "acc[" + n + ":] = [thing_as_string(acc[" + n + ":])]")
+        elif kind is NotNeed:
+            n = self.temp("n")
+            lines.append(ind + n + " = len(acc)")
+            self.emit(thing.thing, options, lines, ind)
+            lines.append(ind + "acc[" + n + ":] = [NotNeed(acc[" + n + ":])]")
+        elif kind is Num:
+            self.emit_num(thing, options, lines, ind)
+        elif kind is Or:
+            self.emit_or(thing, options, lines, ind)
+        elif kind is Look:
+            lines.append(ind + "if " + self.function(thing.thing, options) + "(text, pos, []) < 0:")
+            lines.append(ind + "    return -1")
+        elif kind is Not:
+            self.emit_not(thing, options, lines, ind)
+        elif kind is Rx:
+            self.emit_rx(thing, options, lines, ind)
+        elif kind is Fused and not skips:
+            m = self.temp("m")
+            lines.append(ind + m + " = " + self.regex(thing.regex) + ".match(text, pos)")
+            lines.append(ind + "if None is " + m + ":")
+            lines.append(ind + "    return -1")
+            string = m + ".group()"
+            if None is not thing.escape:
+                string = self.regex(thing.unescape.pattern) + ".sub(r'\\1', " + string + ")"
+            lines.append(ind + "acc.append(" + string + ")")
+            lines.append(ind + "pos = " + m + ".end()")
+        elif kind is Fused:
+            self.emit(thing.thing, options, lines, ind)
+        else:
+            raise TypeError("Can not generate a parser reading "
+                            + repr(kind.__name__) + " things.")
+
+    def emit_num(self, num, options, lines, ind):
+        # Num stops at max_num even if that is less than min_num
+        min_num = num.min_num
+        if num.max_num >= 0:
+            min_num = min(min_num, num.max_num)
+        if min_num == 1:
+            self.emit(num.thing, options, lines, ind)
+        elif min_num > 1:
+            lines.append(ind + "for i in range(" + str(min_num) + "):")
+            self.call(num.thing, options, lines, ind + "    ")
+        if num.max_num >= 0 and num.max_num <= min_num:
+            return
+        read = self.function(num.thing, options)
+        (n, p, c) = (self.temp("n"), self.temp("p"), self.temp("c"))
+        if num.max_num < 0:
+            lines.append(ind + "while True:")
+        else:
+            lines.append(ind + c + " = " + str(num.max_num - min_num))
+            lines.append(ind + "while " + c + " > 0:")
+            lines.append(ind + "    " + c + " -= 1")
+        lines.append(ind + "    " + n + " = len(acc)")
+        lines.append(ind + "    " + p + " = " + read + "(text, pos, acc)")
+        lines.append(ind + "    if " + p + " < 0:")
+        lines.append(ind + "        del acc[" + n + ":]")
+        lines.append(ind + "        break")
+        lines.append(ind + "    pos = " + p)
+
+    def guard(self, thing, char):
+        """Return a condition false only where `thing` can not start, or None."""
+        (first, nullable) = thing_first(thing)
+        if nullable:
+            return None
+        chars = set()
+        tests = []
+        for terminal in first:
+            if isinstance(terminal, str):
+                chars.add(terminal[0])
+            elif isinstance(terminal, Rx):
+                tests.append(self.regex(terminal.regexp) + ".match(" + char + ")")
+            else:
+                return None
+        if 1 == len(chars):
+            tests.insert(0, char + " == " + repr(chars.pop()))
+        elif chars:
+            tests.insert(0, char + " in " + self.constant("_chars", "frozenset("
+                                                          + repr("".join(sorted(chars))) + ")"))
+        return " or ".join(tests)
+
+    def emit_or(self, or_thing, options, lines, ind):
+        skips = self.skips(options)
+        literals = or_thing.literal_set()
+        if None is not literals:
+            self.emit_literals(literals, skips, lines, ind)
+            return
+
+        (n, p, q, ch) = (self.temp("n"), self.temp("p"), self.temp("q"), self.temp("ch"))
+        guards = [None] * len(or_thing.thseq)
+        if or_thing.dispatch and len(or_thing.thseq) > 1:
+            guards = [self.guard(th, ch) for th in or_thing.thseq]
+        inline = [isinstance(th, str) and "first" == or_thing.mode and (not skips or len(th) <= 1)
+                  for th in or_thing.thseq]
+        lines.append(ind + q + " = " + ("_skip(text, pos)" if skips else "pos"))
+        if any(guards):
+            lines.append(ind + ch + " = text[" + q + ":" + q + " + 1]")
+        lines.append(ind + n + " = len(acc)")
+        if "first" == or_thing.mode:
+            lines.append(ind + "while True:")
+            for (th, guard, is_inline) in zip(or_thing.thseq, guards, inline):
+                alt_ind = ind + "    "
+                if None is not guard:
+                    lines.append(alt_ind + "if " + guard + ":")
+                    alt_ind += "    "
+                if is_inline:
+                    lines.append(alt_ind + "if text.startswith(" + repr(th) + ", " + q + "):")
+                    lines.append(alt_ind + "    acc.append(" + repr(th) + ")")
+                    lines.append(alt_ind + "    " + p + " = " + q + " + " + str(len(th)))
+                    lines.append(alt_ind + "    break")
+                else:
+                    lines.append(alt_ind + p + " = " + self.function(th, options) + "(text, pos, acc)")
+                    lines.append(alt_ind + "if " + p + " >= 0:")
+                    lines.append(alt_ind + "    break")
+                    lines.append(alt_ind + "del acc[" + n + ":]")
+            lines.append(ind + "    return -1")
+            lines.append(ind + "pos = " + p)
+        elif "longer" == or_thing.mode:
+            (longest, readed, winner) = (self.temp("l"), self.temp("r"), self.temp("w"))
+            lines.append(ind + longest + " = -1")
+            for (th, guard) in zip(or_thing.thseq, guards):
+                alt_ind = ind
+                tests = []
+                if None is not guard:
+                    tests.append(guard)
+                max_length = or_thing.alt_max_length(th)
+                if max_length >= 0:
+                    # it can not read more than the longest one read
+                    tests.append(longest + " < " + str(max_length))
+                if tests:
+                    lines.append(alt_ind + "if " + " and ".join("(" + test + ")" for test in tests) + ":")
+                    alt_ind += "    "
+                lines.append(alt_ind + readed + " = []")
+                lines.append(alt_ind + p + " = " + self.function(th, options) + "(text, pos, " + readed + ")")
+                lines.append(alt_ind + "if " + p + " >= 0 and len(thing_as_string(" + readed + ")) > " + longest + ":")
+                lines.append(alt_ind + "    " + longest + " = len(thing_as_string(" + readed + "))")
+                lines.append(alt_ind + "    " + winner + " = (" + p + ", " + readed + ")")
+            lines.append(ind + "if " + longest + " < 0:")
+            lines.append(ind + "    return -1")
+            lines.append(ind + "acc.extend(" + winner + "[1])")
+            lines.append(ind + "pos = " + winner + "[0]")
+        else:
+            raise TypeError("Can not generate a parser reading Or in mode " + repr(or_thing.mode) + ".")
+
+    def emit_literals(self, literals, skips, lines, ind):
+        p = self.temp("p")
+        lines.append(ind + p + " = _literals(text, pos, acc, "
+                     + self.constant("_trie", repr(literals.trie)) + ", "
+                     + self.constant("_strings", repr(tuple(literals.strings))) + ", "
+                     + repr(literals.longest) + ", " + repr(skips) + ")")
+        lines.append(ind + "if " + p + " < 0:")
+        lines.append(ind + "    return -1")
+        lines.append(ind + "pos = " + p)
+
+    def emit_not(self, not_thing, options, lines, ind):
+        for th in not_thing.thseq:
+            lines.append(ind + "if " + self.function(th, options) + "(text, pos, []) >= 0:")
+            lines.append(ind + "    return -1")
+        if self.skips(options):
+            lines.append(ind + "pos = _skip(text, pos)")
+        lines.append(ind + "if pos >= len(text):")
+        lines.append(ind + "    return -1")
+        if not_thing.allow_escaped and 1 == len(not_thing.escape_char):
+            lines.append(ind + "if text[pos] == " + repr(not_thing.escape_char) + ":")
+            if self.skips(options):
+                lines.append(ind + "    pos = _skip(text, pos + 1)")
+            else:
+                lines.append(ind + "    pos += 1")
+            lines.append(ind + "    if pos >= len(text):")
+            lines.append(ind + "        return -1")
+        lines.append(ind + "acc.append(text[pos])")
+        lines.append(ind + "pos += 1")
+
+    def emit_rx(self, rx, options, lines, ind):
+        skips = self.skips(options)
+        if None is not rx.run_pattern and not skips:
+            end = self.temp("e")
+            stop = "len(text)" if rx.max_chars < 0 else "pos + " + str(rx.max_chars)
+            lines.append(ind + end + " = " + self.regex(rx.run_pattern.pattern)
+                         + ".match(text, pos, " + stop + ").end()")
+            if rx.min_chars > 0:
+                lines.append(ind + "if " + end + " - pos < " + str(rx.min_chars) + ":")
+                lines.append(ind + "    return -1")
+            lines.append(ind + "acc.append(text[pos:" + end + "])")
+            lines.append(ind + "pos = " + end)
+            return
+        if None is not rx.run_pattern:
+            call = ("_rx_run(text, pos, acc, " + self.regex(rx.run_pattern.pattern) + ", "
+                    + str(rx.min_chars) + ", " + str(rx.max_chars) + ")")
+        elif rx.mode in ("char", "string"):
+            call = ("_rx_chars(text, pos, acc, " + self.regex(rx.regexp) + ", " + str(rx.min_chars)
+                    + ", " + str(rx.max_chars) + ", " + repr(skips) + ", " + repr("string" == rx.mode) + ")")
+        else:
+            lines.append(ind + "return -1")
+            return
+        lines.append(ind + "pos = " + call)
+        lines.append(ind + "if pos < 0:")
+        lines.append(ind + "    return -1")
+
+    def source(self, rules=None):
+        """Return the source of the module reading `rules` (default: all of the grammar)."""
+        if None is rules:
+            rules = self.grammar.rules
+        rules = [self.unref(rule) if isinstance(rule, TRef) else rule for rule in rules]
+        entries = [(rule.name, self.function(rule, {})) for rule in rules]
+        skip_code = NO_SKIP
+        if self.skipping:
+            skip_regex = thing_as_regex(self.skip_pattern)
+            if None is not skip_regex:
+                self.constants["re.compile(" + repr(skip_regex) + ")"] = "_skip_regex"
+                skip_code = SKIP.format(SKIP_REGEX.strip("\n"))
+            else:
+                read = self.function(self.skip_pattern, {"nohooks": True})
+                skip_code = SKIP.format(SKIP_THING.format(read).strip("\n"))
+        constants = [name + " = " + source for (source, name) in sorted(self.constants.items()
+                                                                        , key=lambda item: item[1])]
+        for (node, name) in self.reaches:
+            keys = sorted(key for (other, key) in self.left_recursive.items()
+                          if other is not node and node.reaches_left(other))
+            constants.append(name + " = frozenset(" + repr(keys) + ")")
+        parts = ['"""Parser generated by parser_gen, do not edit."""'
+                 , "from parser          import ParseNode"
+                 + "\nfrom readable_things import NotNeed"
+                 + "\nfrom iters_readers   import (ReadResult, NOMATCH, FULLMATCH)"
+                 + "\nfrom common_classes  import thing_as_string"
+                 + "\n\nimport re"
+                 , "\n".join(constants)
+                 , RUNTIME.strip(), skip_code.strip()]
+        parts.extend(self.sources)
+        parts.append("RULES = {\n" + "".join("    " + repr(name) + ": " + function + ",\n"
+                                              for (name, function) in entries) + "}")
+        parts.append(PARSE.format(entries[0][0] if entries else None).strip())
+        return "\n\n\n".join(parts) + "\n"
+
+
+def generate_parser(grammar, rules=None, skip_pattern=None, memo=False):
+    """Return the source of a parser module for `rules` of `grammar`, see ParserGenerator.
+
+    Without `memo` nested input may take exponential time, and deeply
+    nested input overflows the Python stack (RecursionError).
+    """
+    return ParserGenerator(grammar, skip_pattern, memo).source(rules)
@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# coding UTF-8
+
+## Copyright 2013 Constantin Kulikov
+##
+## Author: Constantin Kulikov (Bad_ptr) <zxnotdead@gmail.com>
+## Date: 2013/08/02 10:12:45
+## License: GPL either version 2 or any later version
+
+"""
+Compiler of the rules of a Grammar to a flat program of a PEG machine
+(choice/commit/fail/call/return instructions, see LPeg) and the machine
+running it on a TextReader over a StringIterator. The program gives the
+same ReadResult as reading the rules with the readers.
+"""
+
+from common_classes  import (ClsShow, thing_as_string
+                             , FIRST_ANY, thing_first, first_accepts)
+
+from iters_readers   import (ReadResult, NOMATCH, FULLMATCH)
+
+from readable_things import (NotNeed, Literal, Seq, Num, Look, Rx, Concat, Or, Not)
+
+from parser          import (Node, TRef)
+
+from utils           import (merge_nested_dicts, freeze_nested_dict)
+
+import sys
+
+
+(LIT, RXRUN, NOTCHAR, TEST, CALL, RET, CHOICE, COMMIT, PCOMMIT, BCOMMIT
+ , FAIL, FAILTWICE, CAP, NODE, NOTNEED, CONCAT, OPAQUE, JUMP, END) = range(19)
+
+OPNAMES = ("LIT", "RXRUN", "NOTCHAR", "TEST", "CALL", "RET", "CHOICE", "COMMIT", "PCOMMIT", "BCOMMIT"
+           , "FAIL", "FAILTWICE", "CAP", "NODE", "NOTNEED", "CONCAT", "OPAQUE", "JUMP", "END")
+
+# kinds of the entries of the machine stack
+RETURN_ENTRY, CHOICE_ENTRY, CAPTURE_ENTRY = range(3)
+
+
+class PegProgram(ClsShow):
+    """Program of the PEG machine for the rules of `grammar`.
+
+    Code is compiled on demand for every (Node, options) a rule is read
+    with: the options of TRef only change how the Nodes are wrapped, so
+    they are resolved at compile time. What has no instructions (Rx in
+    'string' mode, Or in 'longer' mode or over strings only, Surrounded,
+    tokens, left recursive Nodes, ...) is read by the reader in one OPAQUE
+    instruction. Num commits are not done by the machine, it loads the
+    whole input first. The Node calls are memoized in the packrat memo of
+    the reader (see BufferedReader.set_memo) like the readers do, without
+    one nested input may take exponential time as with the readers.
+    Readers without an indexed iterator (e.g. lexer.TokenReader) read the
+    thing themselves.
+    """
+    def __init__(self, grammar=None):
+        self.grammar = grammar
+        self.code = []
+        self.entries = {}
+        self.starts = {}
+        self.calls = []
+        self._ClsShow__no_repr = ["grammar", "code", "entries", "starts", "calls"]
+
+    def start(self, thing, options):
+        """Return the address of the code reading `thing` with `options`."""
+        key = (thing, freeze_nested_dict(options))
+        address = self.starts.get(key)
+        if None is address:
+            address = len(self.code)
+            self.emit(thing, options, not options.get("nohooks"))
+            self.code.append((END,))
+            self.link()
+            self.starts[key] = address
+        return address
+
+    def link(self):
+        # compile the subroutines called until there are no new ones
+        while self.calls:
+            (ins, key, options) = self.calls.pop()
+            address = self.entries.get(key)
+            if None is address:
+                address = self.entries[key] = len(self.code)
+                self.emit_node_body(key[0], options, key[2])
+                self.code.append((RET,))
+            ins[1] = address
+        for i in range(len(self.code)):
+            if isinstance(self.code[i], list):
+                self.code[i] = tuple(self.code[i])
+        return self
+
+    def label(self, ins):
+        ins[1] = len(self.code)
+
+    def emit(self, thing, options, skips):
+        code = self.code
+        kind = type(thing)
+        if isinstance(thing, str):
+            code.append((LIT, thing, skips))
+        elif kind is Node:
+            # the node and options make the key of its memo entries, as in Node._read_into
+            ins = [CALL, None, thing, freeze_nested_dict(options) if options else ()]
+            code.append(ins)
+            self.calls.append((ins, (thing, freeze_nested_dict(options), skips), options))
+        elif kind is TRef:
+            self.emit(thing.unref(), merge_nested_dicts(thing.opts, options), skips)
+        elif kind is Literal:
+            self.emit(thing.string, options, skips)
+        elif kind in (Seq, Concat) or kind in (list, tuple):
+            thseq = thing if kind in (list, tuple) else thing.thseq
+            if kind is Concat:
+                code.append((CAP,))
+            for th in thseq:
+                self.emit(th, options, skips)
+            if kind is Concat:
+                code.append((CONCAT,))
+        elif kind is Num:
+            self.emit_num(thing, options, skips)
+        elif kind is Or and None is not thing.literal_set():
+            # the reader matches all the strings in one pass
+            code.append((OPAQUE, thing, options))
+        elif kind is Or and thing.mode == "first":
+            self.emit_or(thing, options, skips)
+        elif kind is NotNeed:
+            code.append((CAP,))
+            self.emit(thing.thing, options, skips)
+            code.append((NOTNEED,))
+        elif kind is Look:
+            choice = [CHOICE, None]
+            code.append(choice)
+            self.emit(thing.thing, options, skips)
+            back = [BCOMMIT, None]
+            code.append(back)
+            self.label(choice)
+            code.append((FAIL,))
+            self.label(back)
+        elif kind is Not:
+            for th in thing.thseq:
+                choice = [CHOICE, None]
+                code.append(choice)
+                self.emit(th, options, skips)
+                code.append((FAILTWICE,))
+                self.label(choice)
+            escape = None
+            if thing.allow_escaped and len(thing.escape_char) == 1:
+                escape = thing.escape_char
+            code.append((NOTCHAR, escape, skips))
+        elif kind is Rx and None is not thing.run_pattern:
+            code.append((RXRUN, thing, skips))
+        else:
+            code.append((OPAQUE, thing, options))
+
+    def emit_node_body(self, node, options, skips):
+        code = self.code
+        if node.is_left_recursive():
+            code.append((OPAQUE, node, options))
+            return
+        (flat, skip) = node.wrap_options(options)
+        if not flat:
+            code.append((CAP,))
+        self.emit(node.thing, options, skips)
+        if not flat:
+            code.append((NODE, node, skip))
+
+    def emit_num(self, num, options, skips):
+        code = self.code
+        # Num stops at max_num even if that is less than min_num
+        min_num = num.min_num
+        if num.max_num >= 0:
+            min_num = min(min_num, num.max_num)
+        for i in range(min_num):
+            self.emit(num.thing, options, skips)
+        if num.max_num < 0:
+            loop = len(code)
+            choice = [CHOICE, None]
+            code.append(choice)
+            self.emit(num.thing, options, skips)
+            code.append((PCOMMIT, loop + 1))
+            self.label(choice)
+        else:
+            choices = []
+            for i in range(num.max_num - min_num):
+                choice = [CHOICE, None]
+                code.append(choice)
+                choices.append(choice)
+                self.emit(num.thing, options, skips)
+                code.append((COMMIT, len(code) + 1))
+            for choice in choices:
+                self.label(choice)
+
+    def emit_or(self, or_thing, options, skips):
+        code = self.code
+        commits = []
+        for (i, th) in enumerate(or_thing.thseq):
+            last = i + 1 == len(or_thing.thseq)
+            test = None
+            if or_thing.dispatch and len(or_thing.thseq) > 1:
+                (first, nullable) = thing_first(th)
+                if not nullable and FIRST_ANY not in first:
+                    # skip the alternative right away if it can not start here
+                    test = [TEST, None, first, {}, skips]
+                    code.append(test)
+            choice = None
+            if not last:
+                choice = [CHOICE, None]
+                code.append(choice)
+            self.emit(th, options, skips)
+            if not last:
+                commit = [COMMIT, None]
+                code.append(commit)
+                commits.append(commit)
+                self.label(choice)
+            if None is not test:
+                if last:
+                    jump = [JUMP, None]
+                    code.append(jump)
+                    commits.append(jump)
+                    self.label(test)
+                    code.append((FAIL,))
+                else:
+                    self.label(test)
+        for commit in commits:
+            self.label(commit)
+
+    def dump(self):
+        for (i, ins) in enumerate(self.code):
+            print(i, OPNAMES[ins[0]], *ins[1:])
+
+    def read_from(self, tr, thing, **options):
+        """Read `thing` from `tr` running the program, like tr.read_thing."""
+        indexed_iterator = getattr(tr, "indexed_iterator", None)
+        it = None
+        if None is not indexed_iterator:
+            it = indexed_iterator(**options)
+        if None is it:
+            return tr.read_thing(thing, **options)
+        acc = []
+        state = self.run(tr, it, self.start(thing, options), acc)
+        return ReadResult(state, acc, thing)
+
+    def run(self, tr, it, pc, acc):
+        it.ensure(sys.maxsize)
+        text = it.text
+        end = len(text)
+        start = pos = it.pos
+        skipping = None is not tr.skip_pattern
+        skip_regex = tr.skip_regex
+        skipped = [-1, -1]
+        memo = tr.memo
+
+        def skip_at(pos):
+            # like TextReader.skip, at most once per position
+            if pos == skipped[1]:
+                return pos
+            if pos == skipped[0]:
+                return skipped[1]
+            skipped[0] = pos
+            if None is not skip_regex:
+                m = skip_regex.match(text, pos)
+                if None is not m:
+                    pos = m.end()
+            else:
+                it.pos = pos
+                tr.read_thing(tr.skip_pattern, nohooks=True)
+                pos = it.pos
+            skipped[1] = pos
+            return pos
+
+        code = self.code
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        while True:
+            ins = code[pc]
+            op = ins[0]
+            pc += 1
+            failed = False
+            if op <= TEST:
+                # the instructions reading the input skip first
+                origin = pos
+                skips = skipping and ins[-1]
+                if skips:
+                    pos = skip_at(pos)
+                if op == LIT:
+                    string = ins[1]
+                    if text.startswith(string, pos):
+                        pos += len(string)
+                        acc.append(string)
+                    elif skips and string and text.startswith(string[0], pos):
+                        # the skip pattern may match between the chars
+                        it.pos = origin
+                        failed = FULLMATCH != tr.read_thing_into(string, acc)
+                        pos = it.pos
+                    else:
+                        failed = True
+                elif op == TEST:
+                    el = None
+                    if pos < end:
+                        el = text[pos]
+                    cache = ins[3]
+                    ok = cache.get(el)
+                    if None is ok:
+                        ok = cache[el] = first_accepts(ins[2], el)
+                    if not ok:
+                        pc = ins[1]
+                    pos = origin
+                elif op == RXRUN:
+                    # as Rx._read_run
+                    rx = ins[1]
+                    pattern = rx.run_pattern
+                    max_chars = rx.max_chars
+                    n_chars = 0
+                    runs = []
+                    back = origin
+                    while max_chars < 0 or n_chars < max_chars:
+                        if n_chars > 0:
+                            back = pos
+                            pos = skip_at(pos)
+                        limit = end
+                        if max_chars >= 0:
+                            limit = min(end, pos + max_chars - n_chars)
+                        n = pattern.match(text, pos, limit).end() - pos
+                        if n == 0:
+                            pos = back
+                            break
+                        runs.append(text[pos:pos + n])
+                        pos += n
+                        n_chars += n
+                        if not skips:
+                            break
+                    if n_chars >= rx.min_chars:
+                        acc.append("".join(runs))
+                    else:
+                        failed = True
+                elif op == NOTCHAR:
+                    if pos >= end:
+                        failed = True
+                    else:
+                        ch = text[pos]
+                        pos += 1
+                        if ch == ins[1]:
+                            if skips:
+                                pos = skip_at(pos)
+                            if pos >= end:
+                                failed = True
+                            else:
+                                ch = text[pos]
+                                pos += 1
+                        if not failed:
+                            acc.append(ch)
+            elif op == CALL:
+                entry = None
+                if None is not memo:
+                    # the memo is keyed by absolute positions, as tr.tell() gives
+                    entry = memo.get((ins[2], it.offset + pos, ins[3]))
+                if None is entry:
+                    push((RETURN_ENTRY, pc, pos, len(acc), ins))
+                    pc = ins[1]
+                elif FULLMATCH == entry[0]:
+                    pos = entry[1] - it.offset
+                    acc.extend(entry[2])
+                else:
+                    failed = True
+            elif op == RET:
+                entry = pop()
+                if None is not memo:
+                    call = entry[4]
+                    memo.put((call[2], it.offset + entry[2], call[3])
+                             , (FULLMATCH, it.offset + pos, tuple(acc[entry[3]:])))
+                pc = entry[1]
+            elif op == CHOICE:
+                push((CHOICE_ENTRY, ins[1], pos, len(acc)))
+            elif op == COMMIT:
+                pop()
+                pc = ins[1]
+            elif op == CAP:
+                push((CAPTURE_ENTRY, len(acc)))
+            elif op == NODE:
+                n = pop()[1]
+                acc[n:] = [ins[1].make_node(acc[n:], ins[2])]
+            elif op == PCOMMIT:
+                stack[-1] = (CHOICE_ENTRY, stack[-1][1], pos, len(acc))
+                pc = ins[1]
+            elif op == BCOMMIT:
+                entry = pop()
+                pos = entry[2]
+                del acc[entry[3]:]
+                pc = ins[1]
+            elif op == FAIL:
+                failed = True
+            elif op == FAILTWICE:
+                pop()
+                failed = True
+            elif op == NOTNEED:
+                n = pop()[1]
+                acc[n:] = [NotNeed(acc[n:])]
+            elif op == CONCAT:
+                n = pop()[1]
+                acc[n:] = [thing_as_string(acc[n:])]
+            elif op == OPAQUE:
+                it.pos = pos
+                failed = FULLMATCH != tr.read_thing_into(ins[1], acc, **ins[2])
+                pos = it.pos
+            elif op == JUMP:
+                pc = ins[1]
+            elif op == END:
+                it.pos = pos
+                return FULLMATCH
+            if failed:
+                while stack:
+                    entry = pop()
+                    if entry[0] == CHOICE_ENTRY:
+                        pc = entry[1]
+                        pos = entry[2]
+                        del acc[entry[3]:]
+                        break
+                    if entry[0] == RETURN_ENTRY and None is not memo:
+                        call = entry[4]
+                        memo.put((call[2], it.offset + entry[2], call[3]), (NOMATCH, None, ()))
+                else:
+                    it.pos = start
+                    del acc[:]
+                    return NOMATCH
@@ -10,10 +10,14 @@
 
 from common_classes import (ClsShow, gen_indentation, thing_pprint
                             , PStringable, thing_as_string
-                            , PLengthable, thing_as_length)
+                            , PLengthable, thing_as_length
+                            , thing_as_regex, regex_seq, regex_repeat
+                            , FIRST_ANY, thing_first, first_seq, first_accepts
+                            , thing_first_key)
 
 from iters_readers  import (BIReadable, TextReader
-                            ,ReadResult , Nomatch, Fullmatch, Partialmatch)
+                            ,ReadResult , Nomatch, Fullmatch, Partialmatch
+                            , NOMATCH, FULLMATCH, NOMATCH_RESULT)
 
 from utils          import (_or, get_from_nested_dict, merge_nested_dicts, set_to_nested_dict)
 
@@ -51,10 +55,25 @@ class NotNeed(PStringable, BIReadable):
         return thing_as_string(self.thing)
 
     def _read_from(self, tr, **options):
-        rslt = tr.read_thing(self.thing, **options)
-        if rslt.is_fullmatch():
-            rslt.readedlist = [NotNeed(rslt.readedlist)]
-        return rslt
+        acc = []
+        state = self._read_into(tr, acc, **options)
+        return ReadResult(state, acc, self)
+
+    def _read_into(self, tr, acc, **options):
+        n = len(acc)
+        state = tr.read_thing_into(self.thing, acc, **options)
+        if FULLMATCH == state:
+            acc[n:] = [NotNeed(acc[n:])]
+        return state
+
+    def _as_regex(self):
+        return thing_as_regex(self.thing)
+
+    def _first(self, memo):
+        return thing_first(self.thing, memo)
+
+    def _max_length(self, memo):
+        return thing_max_length(self.thing, memo)
 
 
 class Literal(BIReadable):
@@ -67,6 +86,21 @@ class Literal(BIReadable):
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
         return tr.read_thing(self.string, **options)
 
+    def _read_into(self, tr, acc, **options):
+        return tr.read_thing_into(self.string, acc, **options)
+
+    def _as_regex(self):
+        return thing_as_regex(self.string)
+
+    def _as_literal(self):
+        return thing_as_literal(self.string)
+
+    def _max_length(self, memo):
+        return thing_max_length(self.string, memo)
+
+    def _first(self, memo):
+        return thing_first(self.string, memo)
+
 
 class Seq(BIReadable):
     def __init__(self, *thseq, seq=None):
@@ -79,58 +113,101 @@ class Seq(BIReadable):
                 self.thseq.append(th)
 
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
-        rslt = Fullmatch([], self)
         acc = []
+        state = self._read_into(tr, acc, **options)
+        return ReadResult(state, acc, self)
+
+    def _read_into(self, tr, acc, **options):
+        mark = tr.mark()
+        n = len(acc)
+        state = FULLMATCH
         for th in self.thseq:
-            rslt = tr.read_thing(th, **options)
-            if rslt.is_fullmatch():
-                acc.extend(rslt.readedlist)
-            else:
-                tr.push_back(acc)
+            state = tr.read_thing_into(th, acc, **options)
+            if FULLMATCH != state:
+                tr.reset(mark)
+                del acc[n:]
                 break
-        #print(repr(rslt))
-        if rslt.is_fullmatch():
-            return Fullmatch(acc, self)
-        else:
-            return ReadResult(rslt.state, acc, self)
+        tr.release(mark)
+        return state
+
+    def _as_regex(self):
+        return regex_seq(self.thseq)
+
+    def _first(self, memo):
+        return first_seq(self.thseq, memo)
+
+    def _max_length(self, memo):
+        return max_length_seq(self.thseq, memo)
 
 
 class Num(BIReadable):
-    def __init__(self, thing=None, min_num=1, max_num=-1):
+    """Read `thing` from `min_num` to `max_num` (-1 means unbounded) times.
+
+    With `commit` the reader is committed after each repetition once
+    `min_num` is reached, use it only where the parser never backtracks
+    over the repetitions (e.g. the top level rules of a grammar).
+    `sync` is a string that ends the repetitions (e.g. ";"), the text is
+    split after it to read them in parallel, see batch_parse.parse_parallel.
+    """
+    def __init__(self, thing=None, min_num=1, max_num=-1, commit=False, sync=None):
         self.thing = thing
         self.min_num = min_num
         self.max_num = max_num
+        self.commit = commit
+        self.sync = sync
 
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
-        rslt = Fullmatch([],self)
         acc = []
+        state = self._read_into(tr, acc, **options)
+        return ReadResult(state, acc, self)
+
+    def _read_into(self, tr, acc, **options):
+        mark = tr.mark()
+        start = len(acc)
+        state = FULLMATCH
         n = 0
         while True:
             if self.max_num >= 0 and n >= self.max_num:
                 break
-            rslt = tr.read_thing(self.thing, **options)
-            if rslt.is_fullmatch():
-                acc.extend(rslt.readedlist)
-            else:
+            state = tr.read_thing_into(self.thing, acc, **options)
+            if FULLMATCH != state:
                 break
             n += 1
-        if not rslt.is_fullmatch():
-            if n >= self.min_num:
-                return Fullmatch(acc, self)
-            else:
-                tr.push_back(acc)
-                return ReadResult(rslt.state, acc, self)
-        else:
-            return Fullmatch(acc, self)
-
-def ZeroOrOne(thing=None):
-    return Num(thing, min_num=0, max_num=1)
-
-def ZeroOrMore(thing=None):
-    return Num(thing, min_num=0, max_num=-1)
-
-def OneOrMore(thing=None):
-    return Num(thing, min_num=1, max_num=-1)
+            if self.commit and n >= self.min_num:
+                tr.commit()
+        if FULLMATCH != state and n < self.min_num:
+            tr.reset(mark).release(mark)
+            del acc[start:]
+            return state
+        tr.release(mark)
+        return FULLMATCH
+
+    def _as_regex(self):
+        regex = thing_as_regex(self.thing)
+        if None is regex:
+            return None
+        return regex_repeat(regex, self.min_num, self.max_num)
+
+    def _first(self, memo):
+        (first, nullable) = thing_first(self.thing, memo)
+        return (first, nullable or self.min_num <= 0 or 0 == self.max_num)
+
+    def _max_length(self, memo):
+        length = thing_max_length(self.thing, memo)
+        if 0 == length or 0 == self.max_num:
+            return 0
+        if length < 0 or self.max_num < 0:
+            return -1
+        return length * self.max_num
+
+def ZeroOrOne(thing=None, commit=False):
+    return Num(thing, min_num=0, max_num=1, commit=commit)
+
+def ZeroOrMore(thing=None, commit=False, sync=None):
+    return Num(thing, min_num=0, max_num=-1, commit=commit, sync=sync)
+
+def OneOrMore(thing=None, commit=False, sync=None):
+    return Num(thing, min_num=1, max_num=-1, commit=commit, sync=sync)
 
 
 class Look(BIReadable):
@@ -141,36 +218,150 @@ class Look(BIReadable):
             self.thing = thing
 
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
+        mark = tr.mark()
         rslt = tr.read_thing(self.thing, **options)
-        if rslt.is_fullmatch():
-            tr.push_back(rslt.readedlist)
-        rslt.readedlist = []
-        rslt.readed_object = self
-        return rslt
+        tr.reset(mark).release(mark)
+        return ReadResult(rslt.state, [], self)
+
+    def _read_into(self, tr, acc, **options):
+        mark = tr.mark()
+        state = tr.read_thing(self.thing, **options).state
+        tr.reset(mark).release(mark)
+        return state
+
+    def _as_regex(self):
+        regex = thing_as_regex(self.thing)
+        if None is regex:
+            return None
+        return "(?=" + regex + ")"
+
+    def _first(self, memo):
+        return (thing_first(self.thing, memo)[0], True)
+
+    def _max_length(self, memo):
+        return 0
+
+
+# a regexp matching exactly one char: a char class, an escape, '.' or a plain char
+SINGLE_CHAR_REGEXP = re.compile(r'\[\^?\]?(?:[^\]\\]|\\.)*\]|\\.|[^\\\[\](){}|*+?^$]')
+
+# anchors, boundaries and lookarounds look at the text around the match
+CONTEXT_REGEXP = re.compile(r'\\[AZbBG]|\(\?<?[=!]|[$^]')
+CLASS_OR_ESCAPE_REGEXP = re.compile(r'\[\^?\]?(?:[^\]\\]|\\.)*\]|\\[^AZbBG]')
+
+def regexp_is_context_free(regexp):
+    """True if what `regexp` matches does not depend on the text around it."""
+    return None is CONTEXT_REGEXP.search(CLASS_OR_ESCAPE_REGEXP.sub("", regexp))
 
 
 class Rx(BIReadable):
+    """Read chars matching the regular expression `regexp`.
+
+    In 'char' mode every char must match `regexp`, in 'string' mode the
+    text read so far must. From a TextReader over a StringIterator a run
+    of chars is matched in place with one regex call when `regexp` is a
+    single char pattern ('char' mode) or does not look around ('string'
+    mode), otherwise chars are read one by one.
+    """
     def __init__(self, regexp=r'', mode='char', min_chars=1, max_chars=1):
         self.regexp = regexp
         self.mode = mode
         self.min_chars = min_chars
         self.max_chars = max_chars
+        self.pattern = re.compile(regexp)
+        self.run_pattern = None
+        self.in_place = regexp_is_context_free(regexp)
+        if(self.in_place and 'char' == mode
+           and None is not SINGLE_CHAR_REGEXP.fullmatch(regexp)):
+            self.run_pattern = re.compile("(?:" + regexp + ")*")
+        self._ClsShow__no_repr = ["pattern", "run_pattern", "in_place"]
+
+    def _as_regex(self):
+        if 'char' == self.mode and None is not SINGLE_CHAR_REGEXP.fullmatch(self.regexp):
+            return regex_repeat(self.regexp, self.min_chars, self.max_chars)
+        return None
+
+    def _read_run(self, tr, it, **options):
+        skip = tr.skips(**options)
+        start = it.mark()
+        runs = []
+        n_chars = 0
+        while self.max_chars < 0 or n_chars < self.max_chars:
+            mark = it.mark()
+            if skip:
+                tr.skip()
+            limit = -1
+            if self.max_chars >= 0:
+                limit = self.max_chars - n_chars
+            n = it.match_run(self.run_pattern, limit)
+            if n == 0:
+                it.reset(mark)
+                break
+            runs.append(it.text[it.pos:it.pos + n])
+            it.pos += n
+            n_chars += n
+            if not skip:
+                # skipping between the chars is the only reason to go on
+                break
+        acc = "".join(runs)
+        if n_chars >= self.min_chars:
+            return Fullmatch(acc, self)
+        it.reset(start)
+        return Nomatch(acc, self)
+
+    def _read_string_in_place(self, it):
+        # a match of a prefix stays a match of the longer text
+        # (nothing looks around), so past the first char all is read
+        n_chars = 0
+        if it.ensure(1) >= 1 and None is not self.pattern.match(it.text, it.pos, it.pos + 1):
+            if self.max_chars >= 0:
+                n_chars = min(it.ensure(self.max_chars), self.max_chars)
+            else:
+                n_chars = it.ensure(1)
+                while it.ensure(n_chars + 1) > n_chars:
+                    n_chars = it.ensure(n_chars + 1)
+        acc = it.text[it.pos:it.pos + n_chars]
+        if n_chars >= self.min_chars:
+            it.pos += n_chars
+            return Fullmatch(acc, self)
+        return Nomatch(acc, self)
+
+    def _first(self, memo):
+        return ((self,), self.min_chars <= 0 or 0 == self.max_chars)
+
+    def _max_length(self, memo):
+        return self.max_chars
+
+    def _accepts_first(self, el):
+        if isinstance(el, str):
+            return None is not self.pattern.match(el)
+        return True
 
     #@typecheck(allow_unknown_keywords=True)
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
+        if isinstance(tr, TextReader):
+            it = tr.indexed_iterator(**options)
+            if None is not it:
+                if None is not self.run_pattern:
+                    return self._read_run(tr, it, **options)
+                if(self.in_place and 'string' == self.mode
+                   and not tr.skips(**options)):
+                    return self._read_string_in_place(it)
+        mark = tr.mark()
         n_chars = 0
         acc = ""
         if 'char' == self.mode:
             while True:
                 if self.max_chars >= 0 and n_chars >= self.max_chars:
                     break
+                chmark = tr.mark()
                 ch = tr.read_next(**options)
-                if not ch.is_fullmatch():
-                    break
-                if None is not re.match(self.regexp, thing_as_string(ch.readedlist)):
+                if(ch.is_fullmatch()
+                   and None is not self.pattern.match(thing_as_string(ch.readedlist))):
+                    tr.release(chmark)
                     acc += thing_as_string(ch.readedlist)
                 else:
-                    tr.push_back(ch.readedlist)
+                    tr.reset(chmark).release(chmark)
                     break
                 n_chars += 1
         elif 'string' == self.mode:
@@ -178,22 +369,25 @@ class Rx(BIReadable):
             while True:
                 if self.max_chars >= 0 and n_chars >= self.max_chars:
                     break
+                chmark = tr.mark()
                 ch = tr.read_next(**options)
-                if not ch.is_fullmatch():
-                    break
-                if None is re.match(self.regexp, acc + thing_as_string(ch.readedlist)):
-                    tr.push_back(ch.readedlist)
-                    break
+                if(ch.is_fullmatch()
+                   and None is not self.pattern.match(acc + thing_as_string(ch.readedlist))):
+                    tr.release(chmark)
+                    acc += thing_as_string(ch.readedlist)
                 else:
-                   acc += thing_as_string(ch.readedlist)
+                    tr.reset(chmark).release(chmark)
+                    break
                 n_chars += 1
         else:
+            tr.release(mark)
             return Nomatch([], self)
 
         if n_chars >= self.min_chars:
+            tr.release(mark)
             return Fullmatch(thing_as_string(acc), self)
         else:
-            tr.push_back(acc)
+            tr.reset(mark).release(mark)
             return Nomatch(thing_as_string(acc), self)
 
 
@@ -208,20 +402,101 @@ class Concat(BIReadable):
 
     #@typecheck(allow_unknown_keywords=True)
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
+        mark = tr.mark()
         acc = ""
         for th in self.thseq:
             rslt = tr.read_thing(th, **options)
             if rslt.is_fullmatch():
                 acc += thing_as_string(rslt.readedlist)
             else:
-                tr.push_back(acc)
+                tr.reset(mark).release(mark)
                 return ReadResult(rslt.state, acc, self)
-                break
+        tr.release(mark)
         return Fullmatch(acc, self)
 
+    def _as_regex(self):
+        return regex_seq(self.thseq)
+
+    def _first(self, memo):
+        return first_seq(self.thseq, memo)
+
+    def _max_length(self, memo):
+        return max_length_seq(self.thseq, memo)
+
+
+def thing_max_length(thing, memo=None):
+    """Return the most chars the string of what `thing` reads from a TextReader has, -1 if unbounded."""
+    if None is memo:
+        memo = {}
+    if isinstance(thing, str):
+        return len(thing)
+    elif isinstance(thing, BIReadable):
+        key = id(thing)
+        if key in memo:
+            if None is memo[key]:
+                # recursion, it may read anything
+                return -1
+            return memo[key]
+        memo[key] = None
+        memo[key] = length = thing._max_length(memo)
+        return length
+    elif isinstance(thing, Iterable):
+        return max_length_seq(thing, memo)
+    return -1
+
+def max_length_seq(things, memo=None):
+    total = 0
+    for th in things:
+        length = thing_max_length(th, memo)
+        if length < 0:
+            return -1
+        total += length
+    return total
+
+
+def thing_as_literal(thing):
+    """Return the string `thing` always reads as a whole, None if there is none."""
+    if isinstance(thing, str):
+        return thing
+    elif isinstance(thing, BIReadable):
+        return thing._as_literal()
+    return None
+
+
+class LiteralSet(ClsShow):
+    """The strings of an Or read in one pass by the readers.
+
+    `trie` is a nested dict {char: {...}} where the None key holds the
+    index of the first of `strings` ending there.
+    """
+    def __init__(self, strings=None, longest=False):
+        self.strings = _or(strings, [])
+        self.longest = longest
+        self.trie = {}
+        self.index = {}
+        for (i, string) in enumerate(self.strings):
+            node = self.trie
+            for ch in string:
+                node = node.setdefault(ch, {})
+            node.setdefault(None, i)
+            self.index.setdefault(string, i)
+        self.max_len = max([len(string) for string in self.strings] + [0])
+        self._ClsShow__no_repr = ["trie", "index"]
+
 
 class Or(BIReadable):
-    def __init__(self, *thseq, mode=None):
+    """Read the first (or with mode="longer" the longest) matching of `thseq`.
+
+    With `dispatch` only the alternatives whose FIRST set accepts the next
+    element (char or token) are tried. The alternatives for an element
+    are computed once and cached, call `reset_dispatch` after changing the
+    grammar below the Or. When all the alternatives are strings (str,
+    Literal, lexer.Token) they are matched in one pass with a LiteralSet.
+    In mode "longer" what the longest alternative read is kept, and the
+    alternatives that can not read more (see thing_max_length) are not
+    tried.
+    """
+    def __init__(self, *thseq, mode=None, dispatch=True):
         self.thseq = []
         for th in thseq:
             if isinstance(th, self.__class__):
@@ -229,35 +504,133 @@ class Or(BIReadable):
             else:
                 self.thseq.append(th)
         self.mode = _or(mode, "first")
+        self.dispatch = dispatch
+        self.reset_dispatch()
+        self._ClsShow__no_repr = ["alt_firsts", "dispatch_table", "literals", "max_lengths"]
+
+    def reset_dispatch(self):
+        self.alt_firsts = None
+        self.dispatch_table = {}
+        self.literals = None
+        self.max_lengths = None
+        return self
+
+    def literal_set(self):
+        """Return the LiteralSet of the alternatives, None if one of them is not a string."""
+        if None is self.literals:
+            strings = [thing_as_literal(th) for th in self.thseq]
+            self.literals = False
+            if len(strings) > 1 and None not in strings:
+                self.literals = LiteralSet(strings, "longer" == self.mode)
+        return self.literals or None
+
+    def _read_literals_into(self, tr, acc, **options):
+        literals = self.literal_set()
+        if None is literals or tr.hooked(**options):
+            return None
+        return tr.read_literals_into(literals, acc, **options)
+
+    def alt_max_length(self, th):
+        """Return thing_max_length of the alternative `th`."""
+        if None is self.max_lengths:
+            memo = {}
+            self.max_lengths = dict((id(alt), thing_max_length(alt, memo)) for alt in self.thseq)
+        return self.max_lengths[id(th)]
+
+    def alternatives(self, tr, **options):
+        """Return the alternatives that may match at the next element of `tr`."""
+        if not self.dispatch or len(self.thseq) < 2 or tr.hooked(**options):
+            return self.thseq
+        el = tr.peek(**options)
+        key = thing_first_key(el)
+        alts = self.dispatch_table.get(key)
+        if None is alts:
+            if None is self.alt_firsts:
+                memo = {}
+                self.alt_firsts = [thing_first(th, memo) for th in self.thseq]
+            alts = tuple(th for (th, (first, nullable)) in zip(self.thseq, self.alt_firsts)
+                         if nullable or first_accepts(first, el))
+            if None is not key or None is el:
+                self.dispatch_table[key] = alts
+        return alts
+
+    def _first(self, memo):
+        terminals = []
+        nullable = False
+        for th in self.thseq:
+            (first, th_nullable) = thing_first(th, memo)
+            terminals.extend(first)
+            nullable = nullable or th_nullable
+        return (tuple(terminals), nullable)
+
+    def _max_length(self, memo):
+        lengths = [thing_max_length(th, memo) for th in self.thseq]
+        if -1 in lengths:
+            return -1
+        return max(lengths + [0])
 
     def _read_from(self:object, tr:TextReader, **options) -> ReadResult:
+        acc = []
+        state = self._read_literals_into(tr, acc, **options)
+        if FULLMATCH == state:
+            return ReadResult(state, acc, self)
+        elif None is not state:
+            return NOMATCH_RESULT
+
         if self.mode == "first":
 
-            for th in self.thseq:
+            for th in self.alternatives(tr, **options):
                 rslt = tr.read_thing(th, **options)
                 if rslt.is_fullmatch():
                     return rslt
-            return Nomatch([], self)
+            return NOMATCH_RESULT
 
         elif self.mode == "longer":
+            # an alternative that can not read more than the longest one
+            # read is not tried, the longest is kept with its end
+            prune = isinstance(tr, TextReader) and not tr.hooked(**options)
             maxl = -1
-            mid = -1
-            i = 0
-            for th in self.thseq:
+            longest = None
+            mark = tr.mark()
+            for th in self.alternatives(tr, **options):
+                if prune and 0 <= self.alt_max_length(th) <= maxl:
+                    continue
                 rslt = tr.read_thing(th, **options)
                 if rslt.is_fullmatch():
                     l = len(thing_as_string(rslt.readedlist))
                     if l > maxl:
                         maxl = l
-                        mid = i
-                    tr.push_back(rslt.readedlist)
-                i += 1
-
-            if mid < 0:
-                return Nomatch([], self)
+                        longest = rslt
+                        end = tr.tell()
+                    tr.reset(mark)
+            if None is not longest:
+                tr.seek(end)
+            tr.release(mark)
+
+            if None is longest:
+                return NOMATCH_RESULT
             else:
-                rslt = tr.read_thing(self.thseq[mid])
-                return rslt
+                return longest
+
+    def _read_into(self, tr, acc, **options):
+        state = self._read_literals_into(tr, acc, **options)
+        if None is not state:
+            return state
+        if self.mode == "first":
+            for th in self.alternatives(tr, **options):
+                state = tr.read_thing_into(th, acc, **options)
+                if FULLMATCH == state:
+                    return state
+            return NOMATCH
+        return super()._read_into(tr, acc, **options)
+
+    def _as_regex(self):
+        if self.mode != "first":
+            return None
+        parts = [thing_as_regex(th) for th in self.thseq]
+        if None in parts:
+            return None
+        return "(?>" + "|".join(parts) + ")"
 
 
 class Not(BIReadable):
@@ -272,42 +645,69 @@ class Not(BIReadable):
         self.allow_escaped = allow_escaped
 
     def _read_from(self:object, tr : TextReader, **options) -> ReadResult:
+        mark = tr.mark()
         escaped = False
         while True:
             for th in self.thseq:
+                thmark = tr.mark()
                 rslt = tr.read_thing(th, **options)
-                if rslt.is_fullmatch():
-                    tr.push_back(rslt.readedlist)
-                    if not escaped:
-                        return Nomatch()
+                tr.reset(thmark).release(thmark)
+                if rslt.is_fullmatch() and not escaped:
+                    tr.release(mark)
+                    return NOMATCH_RESULT
             rslt = tr.read_next(**options)
             if rslt.is_fullmatch():
                 if escaped:
                     escaped = False
+                    tr.release(mark)
                     return rslt
                 else:
                     if self.allow_escaped and self.escape_char == rslt.readedlist[0]:
                         escaped = True
                         continue
                     else:
+                        tr.release(mark)
                         return rslt
             else:
-                if escaped:
-                    tr.push_back(self.escape_char)
-                rslt.readed_object = self
-                return rslt
-        return Nomatch([], self)
+                tr.reset(mark).release(mark)
+                return NOMATCH_RESULT
+        return NOMATCH_RESULT
+
+    def _as_regex(self):
+        regex = r"[\s\S]"
+        if self.allow_escaped and len(self.escape_char) == 1:
+            escape = re.escape(self.escape_char)
+            regex = "(?:" + escape + r"[\s\S]|(?!" + escape + r")[\s\S])"
+        if len(self.thseq) > 0:
+            parts = [thing_as_regex(th) for th in self.thseq]
+            if None in parts:
+                return None
+            regex = "(?!" + "|".join(parts) + ")" + regex
+        return regex
+
+    def _first(self, memo):
+        return ((FIRST_ANY,), False)
+
+    def _max_length(self, memo):
+        return 1
 
 
 class Surrounded(BIReadable):
-    def __init__(begining=None, ending=None, escape_char="\\", allow_escaped=True, allow_nesting=True):
+    def __init__(self, begining=None, ending=None, escape_char="\\", allow_escaped=True, allow_nesting=True):
         self.begining = begining
         self.ending = ending
         self.escape_char = escape_char
         self.allow_escaped = allow_escaped
         self.allow_nesting = allow_nesting
 
+    def _first(self, memo):
+        (first, nullable) = thing_first(self.begining, memo)
+        if nullable:
+            return ((FIRST_ANY,), True)
+        return (first, False)
+
     def _read_from(self, tr, **options) -> ReadResult:
+        mark = tr.mark()
         escaped = False
         nesting_level = 1
         acc = []
@@ -315,6 +715,7 @@ class Surrounded(BIReadable):
         begin_result = tr.read_thing(self.begining)
         acc.extend(begin_result.readedlist)
         if not begin_result.is_fullmatch():
+            tr.release(mark)
             return Nomatch(begin_result.readedlist, self)
 
         while True:
@@ -339,7 +740,7 @@ class Surrounded(BIReadable):
             else:
                 th_begin = tr.read_thing(self.begining, **options)
                 if th_begin.is_fullmatch():
-                    if allow_nesting:
+                    if self.allow_nesting:
                         nesting_level += 1
                     acc.extend(th_begin.readedlist)
                     continue
@@ -365,7 +766,172 @@ class Surrounded(BIReadable):
                     break
 
         if nesting_level <= 0:
+            tr.release(mark)
             return Fullmatch(acc, self)
         else:
-            tr.push_back(acc)
+            tr.reset(mark).release(mark)
             return Nomatch(acc, self)
+
+
+def match_in_window(pattern, it, lookahead):
+    """Match the compiled `pattern` at the position of the StringIterator `it`.
+
+    The window is extended to `lookahead` chars first, then while the
+    match reaches its end, so a match or a failure may only be wrong
+    past `lookahead` chars. The position is not moved.
+    """
+    avail = it.ensure(lookahead)
+    m = pattern.match(it.text, it.pos)
+    while None is not m and m.end() >= len(it.text) and not it.input_done:
+        # the match may go on in the rest of the input
+        avail = it.ensure(2 * avail)
+        m = pattern.match(it.text, it.pos)
+    return m
+
+
+class Fused(BIReadable):
+    """Read what `thing` reads with one match of the regular expression `regex`.
+
+    `thing` must read one string: the text matched by `regex`, with the
+    chars after `escape` unescaped (see Not). The regex is used from a
+    TextReader over a StringIterator when the reader does not skip, once
+    the whole input is in the window or there are at least
+    `skip_lookahead` chars after the position, else `thing` is read.
+    """
+    def __init__(self, thing=None, regex=r'', escape=None):
+        self.thing = thing
+        self.regex = regex
+        self.escape = escape
+        self.pattern = re.compile(regex)
+        self.unescape = None
+        if None is not escape:
+            self.unescape = re.compile(re.escape(escape) + r'([\s\S])')
+        self._ClsShow__no_repr = ["pattern", "unescape"]
+
+    def _read_from(self, tr, **options):
+        acc = []
+        state = self._read_into(tr, acc, **options)
+        return ReadResult(state, acc, self)
+
+    def _read_into(self, tr, acc, **options):
+        it = None
+        if isinstance(tr, TextReader) and not tr.skips(**options):
+            it = tr.indexed_iterator(**options)
+        if None is it:
+            return tr.read_thing_into(self.thing, acc, **options)
+        m = match_in_window(self.pattern, it, tr.skip_lookahead)
+        if None is m:
+            return NOMATCH
+        string = m.group()
+        if None is not self.unescape:
+            string = self.unescape.sub(r'\1', string)
+        it.pos = m.end()
+        acc.append(string)
+        return FULLMATCH
+
+    def _as_regex(self):
+        return self.regex
+
+    def _first(self, memo):
+        return thing_first(self.thing, memo)
+
+    def _max_length(self, memo):
+        return thing_max_length(self.thing, memo)
+
+
+def lexical_leaves(thing, leaves, escapes):
+    """Collect the chars reading leaves of `thing` and the escape chars of its Nots.
+
+    Return False if `thing` is not made of strings, Literal, Seq, Concat,
+    Num, NotNeed, Look, Or in 'first' mode, Rx and Not only.
+    """
+    if isinstance(thing, str):
+        leaves.append(thing)
+    elif isinstance(thing, (Literal, Rx)):
+        leaves.append(thing)
+    elif isinstance(thing, (NotNeed, Num)):
+        return lexical_leaves(thing.thing, leaves, escapes)
+    elif isinstance(thing, Look):
+        # reads nothing
+        return lexical_leaves(thing.thing, [], escapes)
+    elif isinstance(thing, (Seq, Concat)) or (isinstance(thing, Or) and "first" == thing.mode):
+        return all(lexical_leaves(th, leaves, escapes) for th in thing.thseq)
+    elif isinstance(thing, Not):
+        if thing.allow_escaped and 1 == len(thing.escape_char):
+            escapes.add(thing.escape_char)
+        else:
+            leaves.append(thing)
+        return all(lexical_leaves(th, [], escapes) for th in thing.thseq)
+    else:
+        return False
+    return True
+
+def leaf_reads_char(leaf, ch):
+    if isinstance(leaf, Literal):
+        leaf = leaf.string
+    if isinstance(leaf, str):
+        return ch in leaf
+    elif isinstance(leaf, Rx):
+        return None is not leaf.pattern.match(ch)
+    return True
+
+def reads_one_string(thing):
+    """True if `thing` reads a list of one string (what it reads joined)."""
+    if isinstance(thing, (str, Literal, Rx, Not, Concat)):
+        return True
+    if isinstance(thing, Or) and "first" == thing.mode:
+        return all(reads_one_string(th) for th in thing.thseq)
+    return False
+
+def fuse(thing):
+    """Return a Fused reading `thing` with one regex as one string, or None."""
+    leaves = []
+    escapes = set()
+    if not lexical_leaves(thing, leaves, escapes) or len(escapes) > 1:
+        return None
+    escape = None
+    if escapes:
+        # the escape chars must all be the ones of the Nots
+        escape = escapes.pop()
+        if any(leaf_reads_char(leaf, escape) for leaf in leaves):
+            return None
+    regex = thing_as_regex(thing)
+    if None is regex:
+        return None
+    try:
+        return Fused(thing, regex, escape)
+    except re.error:
+        return None
+
+def fuse_regular(thing, memo=None):
+    """Return `thing` with its parts reading one string by a regex replaced by Fused.
+
+    Parts below `thing` are replaced in place, what has a `_fuse_regular`
+    method (e.g. TokenType) does it itself. Only the parts worth it are
+    fused: Concat, Or of such parts and Not of something.
+    """
+    if None is memo:
+        memo = {}
+    key = id(thing)
+    if key in memo:
+        return memo[key]
+    memo[key] = thing
+    if isinstance(thing, Fused):
+        return thing
+    if(isinstance(thing, (Concat, Or, Not)) and reads_one_string(thing)
+       and (not isinstance(thing, Not) or thing.thseq)):
+        fused = fuse(thing)
+        if None is not fused:
+            memo[key] = fused
+            return fused
+    if hasattr(thing, "_fuse_regular"):
+        thing._fuse_regular(memo)
+        return thing
+    if isinstance(getattr(thing, "thseq", None), list):
+        thing.thseq = [fuse_regular(th, memo) for th in thing.thseq]
+    for attr in ("thing", "begining", "ending"):
+        if hasattr(thing, attr):
+            setattr(thing, attr, fuse_regular(getattr(thing, attr), memo))
+    if isinstance(thing, Or):
+        thing.reset_dispatch()
+    return thing
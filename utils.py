@@ -40,6 +40,15 @@ def merge_nested_dicts(a, b):
     else:
         return b
 
+def freeze_nested_dict(di):
+    """Return a hashable equivalent of the nested dict `di`."""
+    if isinstance(di, dict):
+        return tuple(sorted((k, freeze_nested_dict(v)) for (k,v) in di.items()))
+    elif isinstance(di, (list, tuple)):
+        return tuple(freeze_nested_dict(v) for v in di)
+    else:
+        return di
+
 def get_from_nested_dict(di, *path):
     if path == ():
         return di
@@ -67,7 +76,7 @@ def add_hook(hook_type="", hook_name="", hook=None, hook_dict=None):
         hook_type_dict = hook_dict[hook_type]
         oldhs = hook_type_dict.get(hook_name, [])
         if not isinstance(oldhs, list):
-            oldhs = [oldh]
+            oldhs = [oldhs]
         oldhs.append(hook)
         hook_type_dict[hook_name] = oldhs
         return hook_dict
@@ -93,3 +102,29 @@ def run_pre_hooks(hook_name="", hook_dict=None, vargs=None, kwargs=None):
 def run_post_hooks(hook_name="", hook_dict=None, vargs=None, kwargs=None):
     return run_hooks(hook_type="post", hook_name=hook_name, hook_dict=hook_dict
                      , vargs=vargs, kwargs=kwargs)
+
+def chain_hooks(hooks=None):
+    hooks = tuple(_or(hooks, ()))
+    if len(hooks) == 0:
+        return None
+    elif len(hooks) == 1:
+        return hooks[0]
+    else:
+        def chained_hooks(*vargs, **kwargs):
+            for hook in hooks:
+                hook(*vargs, **kwargs)
+        return chained_hooks
+
+def compile_hooks(hook_dict=None):
+    """Flatten a hook dict into {(hook_type, hook_name): callable}.
+
+    Each callable runs all the hooks registered under that name, names
+    without hooks are left out.
+    """
+    compiled = {}
+    for (hook_type, hook_type_dict) in _or(hook_dict, {}).items():
+        for (hook_name, hooks) in hook_type_dict.items():
+            hook = chain_hooks(hooks)
+            if None is not hook:
+                compiled[(hook_type, hook_name)] = hook
+    return compiled